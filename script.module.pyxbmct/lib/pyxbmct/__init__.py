@@ -9,8 +9,51 @@ Licence: GPL v.3 http://www.gnu.org/licenses/gpl.html
 """
 
 from __future__ import absolute_import
+from importlib import import_module
+
 from .addonwindow import *
-from .addonskin import BaseSkin
+from .addonskin import BaseSkin, SkinMetrics, DataSkin, load_skin
+
+# Helper classes are imported on first access, so that ``import pyxbmct``
+# does not load modules (e.g. asyncio) that a plugin run does not use.
+_lazy_names = {
+    'ListFilter': 'listfilter',
+    'JumpIndex': 'jumpindex',
+    'ListModel': 'listmodel',
+    'MultiSelection': 'multiselect',
+    'TreeNode': 'treelist',
+    'TreeList': 'treelist',
+    'WindowStateStore': 'winstate',
+    'DataCache': 'datacache',
+    'PropertyCache': 'propcache',
+    'WindowManager': 'windowmanager',
+    'EventLoopThread': 'asyncloop',
+    'TimerWheel': 'timers',
+    'IdleScheduler': 'idle',
+    'TexturePreloader': 'preload',
+    'compile_layout': 'xmlcompiler',
+    'CompiledWindow': 'xmlcompiler',
+    'MemoryTracker': 'memtrack',
+    'track_windows': 'memtrack',
+    'PerformanceHUD': 'perfhud',
+    'ProfileSession': 'profiling',
+    'JsonRpcError': 'jsonrpc',
+    'JsonRpcSource': 'jsonrpc',
+    'call_batch': 'jsonrpc',
+    'TableColumn': 'datatable',
+    'DataTable': 'datatable',
+    'TextViewer': 'textviewer',
+}
+
+
+def __getattr__(name):
+    module_name = _lazy_names.get(name)
+    if module_name is None:
+        raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+    value = getattr(import_module('.' + module_name, __name__), name)
+    globals()[name] = value
+    return value
+
 
 __all__ = [
     'ALIGN_LEFT',
@@ -26,6 +69,8 @@ __all__ = [
     'ACTION_MOVE_RIGHT',
     'ACTION_MOVE_UP',
     'ACTION_MOVE_DOWN',
+    'ACTION_PAGE_UP',
+    'ACTION_PAGE_DOWN',
     'ACTION_MOUSE_WHEEL_UP',
     'ACTION_MOUSE_WHEEL_DOWN',
     'ACTION_MOUSE_DRAG',
@@ -41,11 +86,45 @@ __all__ = [
     'Edit',
     'List',
     'Slider',
+    'Focused',
+    'FocusChanged',
+    'SelectionChanged',
     'BlankFullWindow',
     'BlankDialogWindow',
     'AddonDialogWindow',
     'AddonFullWindow',
     'Skin',
     'skin',
-    'BaseSkin'
+    'set_skin',
+    'get_skin',
+    'BaseSkin',
+    'SkinMetrics',
+    'DataSkin',
+    'load_skin',
+    'ListFilter',
+    'JumpIndex',
+    'ListModel',
+    'MultiSelection',
+    'TreeNode',
+    'TreeList',
+    'WindowStateStore',
+    'DataCache',
+    'PropertyCache',
+    'WindowManager',
+    'EventLoopThread',
+    'TimerWheel',
+    'IdleScheduler',
+    'TexturePreloader',
+    'compile_layout',
+    'CompiledWindow',
+    'MemoryTracker',
+    'track_windows',
+    'PerformanceHUD',
+    'ProfileSession',
+    'JsonRpcError',
+    'JsonRpcSource',
+    'call_batch',
+    'TableColumn',
+    'DataTable',
+    'TextViewer',
 ]
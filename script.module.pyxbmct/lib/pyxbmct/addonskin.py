@@ -5,14 +5,147 @@
 # Licence: GPL v.3 <http://www.gnu.org/licenses/gpl.html>
 """Classes for defining the appearance of PyXBMCt Windows and Controls"""
 
+import configparser
+import json
 import os
 from abc import ABC, abstractmethod
 
+import xbmcgui
 import xbmcvfs
 from xbmcaddon import Addon
 
 ADDON_DIR = xbmcvfs.translatePath(Addon('script.module.pyxbmct').getAddonInfo('path'))
 
+METRIC_NAMES = (
+    'images',
+    'x_margin',
+    'y_margin',
+    'title_bar_x_shift',
+    'title_bar_y_shift',
+    'title_back_y_shift',
+    'header_height',
+    'close_btn_width',
+    'close_btn_height',
+    'close_btn_x_offset',
+    'close_btn_y_offset',
+    'header_align',
+    'header_text_color',
+    'background_img',
+    'title_background_img',
+    'close_button_focus',
+    'close_button_no_focus',
+    'main_bg_img',
+)
+"""Names of skin properties"""
+
+_INT_METRICS = frozenset((
+    'x_margin',
+    'y_margin',
+    'title_bar_x_shift',
+    'title_bar_y_shift',
+    'title_back_y_shift',
+    'header_height',
+    'close_btn_width',
+    'close_btn_height',
+    'close_btn_x_offset',
+    'close_btn_y_offset',
+    'header_align',
+))
+
+
+_skin_listeners = []
+_texture_variants = {}
+
+
+def select_texture_variant(skin_dir):
+    """
+    Get a texture directory that matches the display resolution
+
+    Texture variants are built by ``tools/build_textures.py`` into subdirectories
+    of ``skin_dir`` that are listed in ``variants.json`` file.
+    The smallest variant that is not smaller than the display height is selected,
+    or the largest one if the display is bigger than all variants.
+
+    :param skin_dir: texture directory of a skin.
+    :return: variant directory or ``skin_dir`` if it has no variants.
+    :rtype: str
+    """
+    try:
+        return _texture_variants[skin_dir]
+    except KeyError:
+        pass
+    selected = skin_dir
+    try:
+        with open(os.path.join(skin_dir, 'variants.json')) as fo:
+            variants = json.load(fo)['variants']
+    except (IOError, OSError, ValueError, KeyError):
+        variants = None
+    if variants:
+        try:
+            screen_height = xbmcgui.getScreenHeight()
+        except AttributeError:
+            screen_height = 1080
+        by_height = sorted(variants.items(), key=lambda item: item[1])
+        name = by_height[-1][0]
+        for variant, height in by_height:
+            if height >= screen_height:
+                name = variant
+                break
+        if os.path.isdir(os.path.join(skin_dir, name)):
+            selected = os.path.join(skin_dir, name)
+    _texture_variants[skin_dir] = selected
+    return selected
+
+
+def add_skin_listener(callback):
+    """
+    Register a function that is called when skin properties change
+
+    :param callback: a function that receives a changed skin instance.
+    """
+    if callback not in _skin_listeners:
+        _skin_listeners.append(callback)
+
+
+def remove_skin_listener(callback):
+    """
+    Unregister a function registered with :func:`add_skin_listener`
+
+    :param callback: a registered function.
+    """
+    if callback in _skin_listeners:
+        _skin_listeners.remove(callback)
+
+
+class SkinMetrics:
+    """
+    Immutable snapshot of skin properties
+
+    All properties of :class:`BaseSkin` are available as plain attributes,
+    so reading them does not run any skin code.
+
+    .. note:: Instances are created by :meth:`BaseSkin.metrics`. Do not create them directly.
+    """
+    __slots__ = METRIC_NAMES
+
+    def __init__(self, skin):
+        for name in METRIC_NAMES:
+            object.__setattr__(self, name, getattr(skin, name))
+
+    def __setattr__(self, name, value):
+        raise AttributeError('SkinMetrics is immutable!')
+
+    def __delattr__(self, name):
+        raise AttributeError('SkinMetrics is immutable!')
+
+    def __eq__(self, other):
+        if not isinstance(other, SkinMetrics):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in METRIC_NAMES)
+
+    def __hash__(self):
+        return hash(tuple(getattr(self, name) for name in METRIC_NAMES))
+
 
 class BaseSkin(ABC):
     """
@@ -21,6 +154,35 @@ class BaseSkin(ABC):
     .. warning:: This class is meant for subclassing and cannot be instantiated directly!
         A sublcass must implement all the following properties.
     """
+    _metrics = None
+
+    @property
+    def metrics(self):
+        """
+        Get an immutable snapshot of the skin properties
+
+        The snapshot is computed once and reused until :meth:`invalidate_metrics`
+        is called. PyXBMCt windows and controls read skin properties from the snapshot.
+
+        :rtype: SkinMetrics
+        """
+        metrics = self._metrics
+        if metrics is None:
+            metrics = self._metrics = SkinMetrics(self)
+        return metrics
+
+    def invalidate_metrics(self):
+        """
+        Discard the cached :attr:`metrics` snapshot
+
+        Call this method if skin properties have changed.
+        Functions registered with :func:`add_skin_listener` are notified,
+        so open PyXBMCt windows apply the changed skin.
+        """
+        self._metrics = None
+        for callback in list(_skin_listeners):
+            callback(self)
+
     @abstractmethod
     def images(self):
         """
@@ -222,14 +384,17 @@ class Skin(BaseSkin):
     def estuary(self, value):
         if not isinstance(value, bool):
             raise TypeError('estuary property value must be bool!')
-        self._estuary = value
+        if value != self._estuary:
+            self._estuary = value
+            self.invalidate_metrics()
 
     @property
     def images(self):
         if self.estuary:
-            return os.path.join(self._texture_dir, 'estuary')
+            skin_dir = os.path.join(self._texture_dir, 'estuary')
         else:
-            return os.path.join(self._texture_dir, 'confluence')
+            skin_dir = os.path.join(self._texture_dir, 'confluence')
+        return select_texture_variant(skin_dir)
 
     @property
     def x_margin(self):
@@ -334,3 +499,148 @@ class Skin(BaseSkin):
     @property
     def main_bg_img(self):
         return os.path.join(self.images, 'AddonWindow', 'SKINDEFAULT.jpg')
+
+
+class DataSkin(BaseSkin):
+    """
+    DataSkin(values)
+
+    Skin defined by a dictionary of property values
+
+    :param values: a dict with all :class:`BaseSkin` property names as keys.
+    :raises ValueError: if some properties are missing.
+
+    Use :func:`load_skin` to create a skin from a JSON or INI file.
+    """
+    def __init__(self, values):
+        missing = [name for name in METRIC_NAMES if name not in values]
+        if missing:
+            raise ValueError('Missing skin properties: {}'.format(', '.join(missing)))
+        self._values = dict(values)
+
+    @property
+    def images(self):
+        return self._values['images']
+
+    @property
+    def x_margin(self):
+        return self._values['x_margin']
+
+    @property
+    def y_margin(self):
+        return self._values['y_margin']
+
+    @property
+    def title_bar_x_shift(self):
+        return self._values['title_bar_x_shift']
+
+    @property
+    def title_bar_y_shift(self):
+        return self._values['title_bar_y_shift']
+
+    @property
+    def title_back_y_shift(self):
+        return self._values['title_back_y_shift']
+
+    @property
+    def header_height(self):
+        return self._values['header_height']
+
+    @property
+    def close_btn_width(self):
+        return self._values['close_btn_width']
+
+    @property
+    def close_btn_height(self):
+        return self._values['close_btn_height']
+
+    @property
+    def close_btn_x_offset(self):
+        return self._values['close_btn_x_offset']
+
+    @property
+    def close_btn_y_offset(self):
+        return self._values['close_btn_y_offset']
+
+    @property
+    def header_align(self):
+        return self._values['header_align']
+
+    @property
+    def header_text_color(self):
+        return self._values['header_text_color']
+
+    @property
+    def background_img(self):
+        return self._values['background_img']
+
+    @property
+    def title_background_img(self):
+        return self._values['title_background_img']
+
+    @property
+    def close_button_focus(self):
+        return self._values['close_button_focus']
+
+    @property
+    def close_button_no_focus(self):
+        return self._values['close_button_no_focus']
+
+    @property
+    def main_bg_img(self):
+        return self._values['main_bg_img']
+
+
+def load_skin(path, base=None):
+    """
+    Load a skin from a JSON or INI file
+
+    A JSON file must contain an object, an INI file must have ``[skin]`` section,
+    with :class:`BaseSkin` property names as keys. Properties missing in the file
+    are taken from ``base`` skin. A relative ``images`` path is resolved
+    against the file directory, relative texture paths are resolved against ``images``.
+
+    :param path: path to a ``.json`` or ``.ini`` file.
+    :param base: (opt) a skin that provides missing properties.
+        By default the standard :class:`Skin` is used.
+    :rtype: DataSkin
+
+    Example::
+
+        pyxbmct.addonwindow.skin = load_skin(os.path.join(addon_dir, 'resources', 'skin.json'))
+
+    ``skin.json``::
+
+        {
+            "images": "media",
+            "header_height": 50,
+            "header_text_color": "0xFF00BFFF",
+            "background_img": "panel.png"
+        }
+    """
+    if path.lower().endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as fo:
+            values = json.load(fo)
+    else:
+        parser = configparser.ConfigParser(interpolation=None)
+        with open(path, 'r', encoding='utf-8') as fo:
+            parser.read_file(fo)
+        values = dict(parser['skin'])
+    unknown = set(values) - set(METRIC_NAMES)
+    if unknown:
+        raise ValueError('Unknown skin properties: {}'.format(', '.join(sorted(unknown))))
+    for name in _INT_METRICS.intersection(values):
+        values[name] = int(values[name])
+    file_names = set(values)
+    if 'images' in values:
+        values['images'] = os.path.join(os.path.dirname(os.path.abspath(path)), values['images'])
+    if base is None:
+        base = Skin()
+    base_metrics = base.metrics
+    for name in METRIC_NAMES:
+        values.setdefault(name, getattr(base_metrics, name))
+    for name in ('background_img', 'title_background_img', 'close_button_focus',
+                 'close_button_no_focus', 'main_bg_img'):
+        if name in file_names:
+            values[name] = os.path.join(values['images'], values[name])
+    return DataSkin(values)
@@ -11,14 +11,23 @@ This module contains all classes and constants of PyXBMCt framework
 """
 
 import os
+import sys
+import threading
+import time
+import types
+import weakref
+from abc import ABC, abstractmethod
 
 import xbmc
 import xbmcgui
 
-from .addonskin import Skin
+from .addonskin import Skin, add_skin_listener
 
 skin = Skin()
 
+# Live PyXBMCt windows that are updated on skin change
+_windows = weakref.WeakSet()
+
 # Text alighnment constants. Mixed variants are obtained by bit OR (|)
 ALIGN_LEFT = 0
 """Align left"""
@@ -49,6 +58,10 @@ ACTION_MOVE_UP = 3
 """Up arrow key"""
 ACTION_MOVE_DOWN = 4
 """Down arrow key"""
+ACTION_PAGE_UP = 5
+"""Page up key"""
+ACTION_PAGE_DOWN = 6
+"""Page down key"""
 ACTION_MOUSE_WHEEL_UP = 104
 """Mouse wheel up"""
 ACTION_MOUSE_WHEEL_DOWN = 105
@@ -59,6 +72,8 @@ ACTION_MOUSE_MOVE = 107
 """Mouse move"""
 ACTION_MOUSE_LEFT_CLICK = 100
 """Mouse click"""
+ACTION_SHOW_CODEC = 27
+"""Show codec info (``O`` key)"""
 
 
 def _set_textures(textures, kwargs):
@@ -73,6 +88,58 @@ class AddonWindowError(Exception):
     pass
 
 
+def set_skin(new_skin):
+    """
+    Set a new skin and apply it to open windows.
+
+    :param new_skin: :class:`BaseSkin<pyxbmct.addonskin.BaseSkin>` instance.
+
+    Controls created after this call use the new skin.
+    See :meth:`AbstractWindow.applySkin` for what is updated in open windows.
+
+    Example::
+
+        pyxbmct.set_skin(pyxbmct.load_skin(skin_file))
+    """
+    global skin
+    skin = new_skin
+    package = sys.modules.get(__package__)
+    if package is not None:
+        # ``from .addonwindow import *`` has copied the old skin to the package
+        package.skin = new_skin
+    _apply_skin_to_windows()
+
+
+def get_skin():
+    """
+    Get the current skin.
+
+    :return: :class:`BaseSkin<pyxbmct.addonskin.BaseSkin>` instance.
+
+    Use this function instead of keeping a reference to ``pyxbmct.skin``
+    imported with ``from pyxbmct import skin``, which is not updated by :func:`set_skin`.
+    """
+    return skin
+
+
+def _apply_skin_to_windows(changed_skin=None):
+    """Skin listener that updates all live windows"""
+    if changed_skin is not None and changed_skin is not skin:
+        return
+    for window in list(_windows):
+        window.applySkin()
+
+
+add_skin_listener(_apply_skin_to_windows)
+
+
+def _replace_images_dir(path, old_dir, new_dir):
+    """Move a default texture path to a new skin images directory"""
+    if isinstance(path, str) and path.startswith(old_dir + os.sep):
+        return new_dir + path[len(old_dir):]
+    return path
+
+
 class Label(xbmcgui.ControlLabel):
     """
     Label(label, font=None, textColor=None, disabledColor=None, alignment=0,hasPath=False, angle=0)
@@ -103,7 +170,9 @@ class Label(xbmcgui.ControlLabel):
         self.label = Label('Status', angle=45)
     """
     def __new__(cls, *args, **kwargs):
-        return super(Label, cls).__new__(cls, -10, -10, 1, 1, *args, **kwargs)
+        control = super(Label, cls).__new__(cls, -10, -10, 1, 1, *args, **kwargs)
+        control._init_args = (args, kwargs)
+        return control
 
 
 class FadeLabel(xbmcgui.ControlFadeLabel):
@@ -128,7 +197,9 @@ class FadeLabel(xbmcgui.ControlFadeLabel):
         self.fadelabel = FadeLabel(textColor='0xFFFFFFFF')
     """
     def __new__(cls, *args, **kwargs):
-        return super(FadeLabel, cls).__new__(cls, -10, -10, 1, 1, *args, **kwargs)
+        control = super(FadeLabel, cls).__new__(cls, -10, -10, 1, 1, *args, **kwargs)
+        control._init_args = (args, kwargs)
+        return control
 
 
 class TextBox(xbmcgui.ControlTextBox):
@@ -152,7 +223,9 @@ class TextBox(xbmcgui.ControlTextBox):
         self.textbox = TextBox(textColor='0xFFFFFFFF')
     """
     def __new__(cls, *args, **kwargs):
-        return super(TextBox, cls).__new__(cls, -10, -10, 1, 1, *args, **kwargs)
+        control = super(TextBox, cls).__new__(cls, -10, -10, 1, 1, *args, **kwargs)
+        control._init_args = (args, kwargs)
+        return control
 
 
 class Image(xbmcgui.ControlImage):
@@ -177,7 +250,9 @@ class Image(xbmcgui.ControlImage):
         self.image = Image('d:\images\picture.jpg', aspectRatio=2)
     """
     def __new__(cls, *args, **kwargs):
-        return super(Image, cls).__new__(cls, -10, -10, 1, 1, *args, **kwargs)
+        control = super(Image, cls).__new__(cls, -10, -10, 1, 1, *args, **kwargs)
+        control._init_args = (args, kwargs)
+        return control
 
 
 class CompareMixin:
@@ -186,6 +261,22 @@ class CompareMixin:
             return self.getId() == other.getId()
         return False
 
+    def addReplaceListener(self, callback):
+        """
+        Register a function that receives a new control when this control is re-created
+        with the default textures of another skin by :func:`set_skin`.
+
+        :param callback: a function that receives the new control instance.
+
+        Helpers that keep a reference to a control, e.g.
+        :class:`ListModel<pyxbmct.listmodel.ListModel>`, use this method to follow it.
+        Listeners are moved to the new control.
+        """
+        try:
+            self._replace_listeners.append(callback)
+        except AttributeError:
+            self._replace_listeners = [callback]
+
 
 class Button(CompareMixin, xbmcgui.ControlButton):
     """
@@ -227,12 +318,14 @@ class Button(CompareMixin, xbmcgui.ControlButton):
         self.button = Button('Status', font='font14')
     """
     def __new__(cls, *args, **kwargs):
-        textures = {'focusTexture': os.path.join(skin.images, 'Button', 'KeyboardKey.png'),
-                    'noFocusTexture': os.path.join(skin.images, 'Button', 'KeyboardKeyNF.png')}
+        textures = {'focusTexture': os.path.join(skin.metrics.images, 'Button', 'KeyboardKey.png'),
+                    'noFocusTexture': os.path.join(skin.metrics.images, 'Button', 'KeyboardKeyNF.png')}
         _set_textures(textures, kwargs)
         if kwargs.get('alignment') is None:
             kwargs['alignment'] = ALIGN_CENTER
-        return super(Button, cls).__new__(cls, -10, -10, 1, 1, *args, **kwargs)
+        control = super(Button, cls).__new__(cls, -10, -10, 1, 1, *args, **kwargs)
+        control._init_args = (args, kwargs)
+        return control
 
 
 class RadioButton(CompareMixin, xbmcgui.ControlRadioButton):
@@ -286,19 +379,21 @@ class RadioButton(CompareMixin, xbmcgui.ControlRadioButton):
     """
     def __new__(cls, *args, **kwargs):
         if xbmc.getInfoLabel('System.BuildVersion')[:2] >= '13':
-            textures = {'focusTexture': os.path.join(skin.images, 'RadioButton', 'MenuItemFO.png'),
-                        'noFocusTexture': os.path.join(skin.images, 'RadioButton', 'MenuItemNF.png'),
-                        'focusOnTexture': os.path.join(skin.images, 'RadioButton', 'radiobutton-focus.png'),
-                        'noFocusOnTexture': os.path.join(skin.images, 'RadioButton', 'radiobutton-focus.png'),
-                        'focusOffTexture': os.path.join(skin.images, 'RadioButton', 'radiobutton-nofocus.png'),
-                        'noFocusOffTexture': os.path.join(skin.images, 'RadioButton', 'radiobutton-nofocus.png')}
+            textures = {'focusTexture': os.path.join(skin.metrics.images, 'RadioButton', 'MenuItemFO.png'),
+                        'noFocusTexture': os.path.join(skin.metrics.images, 'RadioButton', 'MenuItemNF.png'),
+                        'focusOnTexture': os.path.join(skin.metrics.images, 'RadioButton', 'radiobutton-focus.png'),
+                        'noFocusOnTexture': os.path.join(skin.metrics.images, 'RadioButton', 'radiobutton-focus.png'),
+                        'focusOffTexture': os.path.join(skin.metrics.images, 'RadioButton', 'radiobutton-nofocus.png'),
+                        'noFocusOffTexture': os.path.join(skin.metrics.images, 'RadioButton', 'radiobutton-nofocus.png')}
         else: # This is for compatibility with Frodo and earlier versions.
-            textures = {'focusTexture': os.path.join(skin.images, 'RadioButton', 'MenuItemFO.png'),
-                        'noFocusTexture': os.path.join(skin.images, 'RadioButton', 'MenuItemNF.png'),
-                        'TextureRadioFocus': os.path.join(skin.images, 'RadioButton', 'radiobutton-focus.png'),
-                        'TextureRadioNoFocus': os.path.join(skin.images, 'RadioButton', 'radiobutton-nofocus.png')}
+            textures = {'focusTexture': os.path.join(skin.metrics.images, 'RadioButton', 'MenuItemFO.png'),
+                        'noFocusTexture': os.path.join(skin.metrics.images, 'RadioButton', 'MenuItemNF.png'),
+                        'TextureRadioFocus': os.path.join(skin.metrics.images, 'RadioButton', 'radiobutton-focus.png'),
+                        'TextureRadioNoFocus': os.path.join(skin.metrics.images, 'RadioButton', 'radiobutton-nofocus.png')}
         _set_textures(textures, kwargs)
-        return super(RadioButton, cls).__new__(cls, -10, -10, 1, 1, *args, **kwargs)
+        control = super(RadioButton, cls).__new__(cls, -10, -10, 1, 1, *args, **kwargs)
+        control._init_args = (args, kwargs)
+        return control
 
 
 class Edit(CompareMixin, xbmcgui.ControlEdit):
@@ -335,10 +430,12 @@ class Edit(CompareMixin, xbmcgui.ControlEdit):
         self.edit = Edit('Status')
     """
     def __new__(cls, *args, **kwargs):
-        textures = {'focusTexture': os.path.join(skin.images, 'Edit', 'button-focus.png'),
-                    'noFocusTexture': os.path.join(skin.images, 'Edit', 'black-back2.png')}
+        textures = {'focusTexture': os.path.join(skin.metrics.images, 'Edit', 'button-focus.png'),
+                    'noFocusTexture': os.path.join(skin.metrics.images, 'Edit', 'black-back2.png')}
         _set_textures(textures, kwargs)
-        return super(Edit, cls).__new__(cls, -10, -10, 1, 1, *args, **kwargs)
+        control = super(Edit, cls).__new__(cls, -10, -10, 1, 1, *args, **kwargs)
+        control._init_args = (args, kwargs)
+        return control
 
 
 class List(CompareMixin, xbmcgui.ControlList):
@@ -369,10 +466,32 @@ class List(CompareMixin, xbmcgui.ControlList):
         self.cList = List('font14', space=5)
     """
     def __new__(cls, *args, **kwargs):
-        textures = {'buttonTexture': os.path.join(skin.images, 'List', 'MenuItemNF.png'),
-                    'buttonFocusTexture': os.path.join(skin.images, 'List', 'MenuItemFO.png')}
+        textures = {'buttonTexture': os.path.join(skin.metrics.images, 'List', 'MenuItemNF.png'),
+                    'buttonFocusTexture': os.path.join(skin.metrics.images, 'List', 'MenuItemFO.png')}
         _set_textures(textures, kwargs)
-        return super(List, cls).__new__(cls, -10, -10, 1, 1, *args, **kwargs)
+        control = super(List, cls).__new__(cls, -10, -10, 1, 1, *args, **kwargs)
+        control._init_args = (args, kwargs)
+        return control
+
+    def getMultiSelection(self):
+        """
+        Get multi-selection state of the list.
+
+        :return: :class:`MultiSelection<pyxbmct.multiselect.MultiSelection>` instance
+            bound to this list. It is created on the first call.
+
+        Example::
+
+            selection = self.list.getMultiSelection()
+            selection.selectAll()
+            selected = list(selection)
+        """
+        try:
+            return self._multi_selection
+        except AttributeError:
+            from .multiselect import MultiSelection
+            self._multi_selection = MultiSelection(self)
+            return self._multi_selection
 
 
 class Slider(CompareMixin, xbmcgui.ControlSlider):
@@ -395,13 +514,149 @@ class Slider(CompareMixin, xbmcgui.ControlSlider):
         self.slider = Slider()
     """
     def __new__(cls, *args, **kwargs):
-        textures = {'textureback': os.path.join(skin.images, 'Slider', 'osd_slider_bg.png'),
-                    'texture': os.path.join(skin.images, 'Slider', 'osd_slider_nibNF.png'),
-                    'texturefocus': os.path.join(skin.images, 'Slider', 'osd_slider_nib.png')}
+        textures = {'textureback': os.path.join(skin.metrics.images, 'Slider', 'osd_slider_bg.png'),
+                    'texture': os.path.join(skin.metrics.images, 'Slider', 'osd_slider_nibNF.png'),
+                    'texturefocus': os.path.join(skin.metrics.images, 'Slider', 'osd_slider_nib.png')}
         _set_textures(textures, kwargs)
         if xbmc.getInfoLabel('System.BuildVersion')[:2] >= '17':
             kwargs['orientation'] = xbmcgui.HORIZONTAL
-        return super(Slider, cls).__new__(cls, -10, -10, 1, 1, *args, **kwargs)
+        control = super(Slider, cls).__new__(cls, -10, -10, 1, 1, *args, **kwargs)
+        control._init_args = (args, kwargs)
+        return control
+
+
+class ChangeEvent(ABC):
+    """
+    Base class for synthesized change events
+
+    PyXBMCt checks connected change events after every key action or control activation
+    and calls a connected function when an observed value has changed
+    and then stayed unchanged for ``debounce`` seconds.
+    If a connected function returns a coroutine and the value changes again
+    before the coroutine is finished, the coroutine is cancelled.
+
+    .. warning:: This is an abstract class and is not supposed to be instantiated directly!
+    """
+    def __init__(self, debounce):
+        self.debounce = debounce
+        self._delivered = None
+        # Debounce timers fire on the timer wheel thread
+        self._lock = threading.Lock()
+        self._timer = None
+        self._future = None
+
+    @abstractmethod
+    def getValue(self, window):
+        """
+        Get the observed value.
+
+        :param window: the window the event is connected in.
+        """
+        return
+
+    def _setTimer(self, timer):
+        """Replace the debounce timer and cancel the previous one"""
+        with self._lock:
+            old, self._timer = self._timer, timer
+        if old is not None:
+            old.cancel()
+
+    def _setFuture(self, future):
+        """Replace the future of a running handler coroutine and cancel the previous one"""
+        with self._lock:
+            old, self._future = self._future, future
+        if old is not None:
+            old.cancel()
+
+    def _cancelPending(self):
+        self._setFuture(None)
+
+
+class FocusChanged(ChangeEvent):
+    """
+    FocusChanged(debounce=0.0)
+
+    An event fired when the focused control of a window changes.
+
+    :param debounce: time in seconds the focus must stay on a control
+        before the event is fired.
+
+    Example::
+
+        self.connect(FocusChanged(), self.update_hint)
+    """
+    def __init__(self, debounce=0.0):
+        super(FocusChanged, self).__init__(debounce)
+
+    def getValue(self, window):
+        try:
+            return window.getFocusId()
+        except RuntimeError:
+            return 0
+
+    def __eq__(self, other):
+        return isinstance(other, FocusChanged)
+
+    def __hash__(self):
+        return hash(FocusChanged)
+
+
+class SelectionChanged(ChangeEvent):
+    """
+    SelectionChanged(control, debounce=0.3)
+
+    An event fired when the selected item of a :class:`List` changes.
+
+    :param control: :class:`List` instance.
+    :param debounce: time in seconds the selection must stay on an item
+        before the event is fired.
+
+    Use this event to load item details only for the item the user settles on.
+    Connected coroutines for items the user has scrolled past are cancelled.
+
+    Example::
+
+        async def load_details(self):
+            item = self.list.getSelectedItem()
+            details = await get_details(item.getLabel())
+            self.plot.setText(details['plot'])
+
+        self.connect(SelectionChanged(self.list, debounce=0.5), self.load_details)
+    """
+    def __init__(self, control, debounce=0.3):
+        super(SelectionChanged, self).__init__(debounce)
+        self.control = control
+
+    def getValue(self, window):
+        return self.control.getSelectedPosition()
+
+    def __eq__(self, other):
+        return isinstance(other, SelectionChanged) and other.control is self.control
+
+    def __hash__(self):
+        return hash((SelectionChanged, id(self.control)))
+
+
+class Focused:
+    """
+    Focused(control)
+
+    An event fired when a control receives focus.
+
+    :param control: a Control instance.
+
+    Example::
+
+        self.connect(Focused(self.movie_button), self.show_movie_hint)
+    """
+    def __init__(self, control):
+        self.control = control
+
+    def __eq__(self, other):
+        return isinstance(other, Focused) and self.control is other.control
+
+    def __hash__(self):
+        return hash((Focused, id(self.control)))
 
 
 class AbstractWindow:
@@ -420,6 +675,81 @@ class AbstractWindow:
     def __init__(self):
         self.actions_connected = []
         self.controls_connected = []
+        self.changes_connected = []
+        self.focus_connected = []
+        self._click_handlers = {}
+        self._focus_handlers = {}
+        self._close_button_id = None
+        self._last_focus_id = 0
+        self._placed_controls = []
+        self._placed_grid = []
+        self._skin_metrics = skin.metrics
+        # Helpers that create their own controls, e.g. DataTable, update them on skin change
+        self._skin_callbacks = []
+        _windows.add(self)
+        self._state_key = None
+        # The event loop, timers and idle tasks are created on first use
+        self._lazy_lock = threading.Lock()
+        self._event_loop_thread = None
+        self._timer_wheel = None
+        self._idle_scheduler = None
+        self._texture_preloader = None
+        self._data_bindings = []
+        memtrack = sys.modules.get(__package__ + '.memtrack')
+        # Tracking is enabled with memtrack.track_windows(), so it is off if the module is not loaded
+        self._memory_tracker = memtrack.create_tracker(self) if memtrack is not None else None
+        self._perf_hud = None
+        self._event_stats = None
+        self._profile_session = None
+        self._profiler = None
+
+    def _getEventLoop(self):
+        """
+        Get the window event loop thread, creating it on first use.
+
+        This is a helper method not to be called directly.
+        """
+        with self._lazy_lock:
+            if self._event_loop_thread is None:
+                from .asyncloop import EventLoopThread
+                self._event_loop_thread = EventLoopThread()
+                self._event_loop_thread.profile_hook = self._profiler
+            return self._event_loop_thread
+
+    def _getTimerWheel(self):
+        """
+        Get the window timer wheel, creating it on first use.
+
+        This is a helper method not to be called directly.
+        """
+        with self._lazy_lock:
+            if self._timer_wheel is None:
+                from .timers import TimerWheel
+                self._timer_wheel = TimerWheel()
+                self._timer_wheel.profile_hook = self._profiler
+            return self._timer_wheel
+
+    def _getIdleScheduler(self):
+        """
+        Get the window idle scheduler, creating it on first use.
+
+        This is a helper method not to be called directly.
+        """
+        timer_wheel = self._getTimerWheel()
+        with self._lazy_lock:
+            if self._idle_scheduler is None:
+                from .idle import IdleScheduler
+                self._idle_scheduler = IdleScheduler(timer_wheel)
+            return self._idle_scheduler
+
+    def _registerInput(self):
+        """
+        Report user input to the idle scheduler if it exists.
+
+        This is a helper method not to be called directly.
+        """
+        if self._idle_scheduler is not None:
+            self._idle_scheduler.touch()
 
     def setGeometry(self, width_, height_, rows_, columns_, pos_x=-1, pos_y=-1):
         """
@@ -482,6 +812,20 @@ class AbstractWindow:
 
             self.placeControl(self.label, 0, 1)
         """
+        grid = (row, column, rowspan, columnspan, pad_x, pad_y)
+        self._setControlRect(control, grid)
+        self.addControl(control)
+        self.setAnimation(control)
+        self._placed_controls.append(control)
+        self._placed_grid.append(grid)
+
+    def _setControlRect(self, control, grid):
+        """
+        Set control position and size from its grid cell.
+
+        This is a helper method not to be called directly.
+        """
+        row, column, rowspan, columnspan, pad_x, pad_y = grid
         try:
             control_x = (self.grid_x + self.tile_width * column) + pad_x
             control_y = (self.grid_y + self.tile_height * row) + pad_y
@@ -492,8 +836,6 @@ class AbstractWindow:
         control.setPosition(control_x, control_y)
         control.setWidth(control_width)
         control.setHeight(control_height)
-        self.addControl(control)
-        self.setAnimation(control)
 
     def getX(self):
         """Get X coordinate of the top-left corner of the window."""
@@ -552,7 +894,8 @@ class AbstractWindow:
         :param event: event to be connected.
         :param callable: callable object the event is connected to.
 
-        An event can be an inctance of a Control object or an integer key action code.
+        An event can be an inctance of a Control object, an integer key action code
+        or a :class:`Focused`, :class:`FocusChanged` or :class:`SelectionChanged` instance.
         Several basic key action codes are provided by PyXBMCt. ``xbmcgui`` module
         provides more action codes.
 
@@ -565,6 +908,9 @@ class AbstractWindow:
         whether the ``Slider`` instance is focused.
 
         ``callable`` parameter is a function or a method to be executed on when the event is fired.
+        It can also be a coroutine function (``async def``) or a callable that returns a coroutine.
+        Such coroutines are scheduled on an asyncio event loop that runs in a background thread
+        (see :meth:`runAsync`), so the event handler does not block the UI.
 
         .. warning:: For connection you must provide a function object without brackets ``()``,
             not a function call!
@@ -578,14 +924,108 @@ class AbstractWindow:
         or::
 
             self.connect(ACTION_NAV_BACK, self.close)
+
+        or::
+
+            async def load_page(self):
+                data = await fetch_page(self.page)
+                self.list.addItems(data)
+
+            self.connect(self.next_button, self.load_page)
         """
         try:
             self.disconnect(event)
         except AddonWindowError:
             if isinstance(event, int):
                 self.actions_connected.append([event, callable])
+            elif isinstance(event, ChangeEvent):
+                event._delivered = event.getValue(self)
+                self.changes_connected.append([event, callable])
+            elif isinstance(event, Focused):
+                self.focus_connected.append([event, callable])
+                self._mapHandler(self._focus_handlers, event.control, callable)
             else:
                 self.controls_connected.append([event, callable])
+                self._mapHandler(self._click_handlers, event, callable)
+
+    def _mapHandler(self, handlers, control, callable):
+        """
+        Add a handler to an integer control ID map.
+
+        This is a helper method not to be called directly.
+        """
+        control_id = control.getId()
+        # A control that is not added to the window yet has no ID.
+        # It is mapped by _mapControls when it is added.
+        if control_id > 0:
+            handlers[control_id] = callable
+
+    def _mapControls(self, controls):
+        """
+        Add handlers of newly added controls to integer control ID maps.
+
+        This is a helper method not to be called directly.
+        """
+        added = set(map(id, controls))
+        for handlers, connected in ((self._click_handlers, self.controls_connected),
+                                    (self._focus_handlers, self.focus_connected)):
+            for event, callable in connected:
+                control = getattr(event, 'control', event)
+                if id(control) in added:
+                    self._mapHandler(handlers, control, callable)
+
+    def _unmapControls(self, controls):
+        """
+        Remove handlers of controls that are being removed from integer control ID maps.
+
+        Kodi assigns a new ID to a control when it is added again.
+
+        This is a helper method not to be called directly.
+        """
+        for control in controls:
+            control_id = control.getId()
+            self._click_handlers.pop(control_id, None)
+            self._focus_handlers.pop(control_id, None)
+
+    def addControl(self, control):
+        """
+        Add a control to the window.
+
+        :param control: control instance to be added.
+
+        Handlers connected to the control are mapped to the ID it gets.
+        """
+        super(AbstractWindow, self).addControl(control)
+        self._mapControls((control,))
+
+    def addControls(self, controls):
+        """
+        Add a list of controls to the window.
+
+        :param controls: the list of control instances to be added.
+
+        Handlers connected to the controls are mapped to the IDs they get.
+        """
+        super(AbstractWindow, self).addControls(controls)
+        self._mapControls(controls)
+
+    def removeControl(self, control):
+        """
+        Remove a control from the window.
+
+        :param control: control instance to be removed.
+        """
+        self._unmapControls((control,))
+        super(AbstractWindow, self).removeControl(control)
+
+    def removeControls(self, controls):
+        """
+        Remove a list of controls from the window.
+
+        :param controls: the list of control instances to be removed.
+        """
+        self._unmapControls(controls)
+        super(AbstractWindow, self).removeControls(controls)
 
     def connectEventList(self, events, function):
         """
@@ -615,11 +1055,22 @@ class AbstractWindow:
         """
         if isinstance(event, int):
              event_list = self.actions_connected
+        elif isinstance(event, ChangeEvent):
+             event_list = self.changes_connected
+        elif isinstance(event, Focused):
+             event_list = self.focus_connected
         else:
              event_list = self.controls_connected
         for index in range(len(event_list)):
             if event == event_list[index][0]:
-                event_list.pop(index)
+                connected_event = event_list.pop(index)[0]
+                if isinstance(connected_event, ChangeEvent):
+                    connected_event._setTimer(None)
+                    connected_event._cancelPending()
+                elif isinstance(connected_event, Focused):
+                    self._focus_handlers.pop(connected_event.control.getId(), None)
+                elif not isinstance(connected_event, int):
+                    self._click_handlers.pop(connected_event.getId(), None)
                 break
         else:
             raise AddonWindowError('The action or control %s is not connected!' % event)
@@ -642,11 +1093,232 @@ class AbstractWindow:
 
         This is a helper method not to be called directly.
         """
+        if self._event_stats is not None:
+            self._event_stats.events += 1
         for item in connected_list:
             if item[0] == event:
-                item[1]()
+                self._runHandler(item[1])
                 break
 
+    def _runHandler(self, handler):
+        """
+        Call an event handler and schedule a returned coroutine.
+
+        This is a helper method not to be called directly.
+        """
+        if self._event_stats is None and self._profiler is None:
+            result = handler()
+        else:
+            result = self._callInstrumented(handler)
+        if isinstance(result, types.CoroutineType):
+            self.runAsync(result)
+
+    def _dispatchClick(self, controlId):
+        """
+        Call a function connected to an activated control by the control ID.
+
+        This is a helper method not to be called directly.
+        """
+        self._registerInput()
+        if controlId == self._close_button_id:
+            self.close()
+            return
+        if self._event_stats is not None:
+            self._event_stats.events += 1
+        handler = self._click_handlers.get(controlId)
+        if handler is not None:
+            self._runHandler(handler)
+        self._checkChanges()
+
+    def _dispatchFocus(self, controlId):
+        """
+        Call a function connected to a :class:`Focused` event by the control ID.
+
+        This is a helper method not to be called directly.
+        """
+        self._last_focus_id = controlId
+        handler = self._focus_handlers.get(controlId)
+        if handler is not None:
+            self._runHandler(handler)
+
+    def _checkFocus(self):
+        """
+        Fire :class:`Focused` events for windows that do not receive ``onFocus`` calls.
+
+        This is a helper method not to be called directly.
+        """
+        if not self.focus_connected:
+            return
+        try:
+            focus_id = self.getFocusId()
+        except RuntimeError:
+            return
+        if focus_id != self._last_focus_id:
+            self._dispatchFocus(focus_id)
+
+    def onClick(self, controlId):
+        """
+        Catch activated controls by their IDs.
+
+        ``controlId`` is an integer ID of the activated control.
+        """
+        self._dispatchClick(controlId)
+
+    def onFocus(self, controlId):
+        """
+        Catch focused controls by their IDs.
+
+        ``controlId`` is an integer ID of the focused control.
+        """
+        self._dispatchFocus(controlId)
+
+    def _callInstrumented(self, handler):
+        """
+        Call an event handler with timing and profiling if they are enabled.
+
+        This is a helper method not to be called directly.
+        """
+        stats = self._event_stats
+        profiler = self._profiler
+        started = time.perf_counter()
+        if profiler is None:
+            result = handler()
+        else:
+            result = profiler.call(handler)
+        if stats is not None:
+            stats.latencies.append(time.perf_counter() - started)
+        return result
+
+    def _checkChanges(self):
+        """
+        Restart debounce timers of connected change events.
+
+        This is a helper method not to be called directly.
+        """
+        for event, handler in self.changes_connected:
+            if event.getValue(self) != event._delivered:
+                event._cancelPending()
+            event._setTimer(self.call_later(event.debounce, self._fireChange, event, handler))
+
+    def _fireChange(self, event, handler):
+        """
+        Call a function connected to a change event if the observed value has changed.
+
+        This is a helper method not to be called directly.
+        """
+        value = event.getValue(self)
+        with event._lock:
+            if value == event._delivered:
+                return
+            event._delivered = value
+        event._cancelPending()
+        if self._profiler is None:
+            result = handler()
+        else:
+            result = self._profiler.call(handler)
+        if isinstance(result, types.CoroutineType):
+            event._setFuture(self.runAsync(result))
+
+    def runAsync(self, coro):
+        """
+        Schedule a coroutine on the window event loop.
+
+        :param coro: coroutine object.
+        :return: :class:`concurrent.futures.Future` instance for the coroutine result.
+
+        The event loop runs in a background thread that is started on demand.
+        When the window is closed, all outstanding tasks are cancelled at their
+        next ``await``, so code after an ``await`` does not update controls of
+        a closed window. Exceptions raised by coroutines are written to the Kodi log.
+
+        Example::
+
+            self.runAsync(self.load_thumbnails())
+        """
+        return self._getEventLoop().submit(coro)
+
+    def call_later(self, delay, callback, *args):
+        """
+        Call a function once after a delay.
+
+        :param delay: delay in seconds.
+        :param callback: a function to be called.
+        :param args: positional arguments for the function.
+        :return: :class:`Timer<pyxbmct.timers.Timer>` instance that has ``cancel()`` method.
+
+        All window timers are served by a single background thread (see :class:`TimerWheel<pyxbmct.timers.TimerWheel>`)
+        and are cancelled when the window is closed or Kodi exits.
+
+        Example::
+
+            self.call_later(3, self.hide_notification)
+        """
+        return self._getTimerWheel().call_later(delay, callback, *args)
+
+    def call_every(self, interval, callback, *args):
+        """
+        Call a function periodically.
+
+        :param interval: interval in seconds.
+        :param callback: a function to be called.
+        :param args: positional arguments for the function.
+        :return: :class:`Timer<pyxbmct.timers.Timer>` instance that has ``cancel()`` method.
+
+        See :meth:`call_later` for more info.
+
+        Example::
+
+            self.clock_timer = self.call_every(1, self.update_clock)
+        """
+        return self._getTimerWheel().call_every(interval, callback, *args)
+
+    def runWhenIdle(self, task, priority=0):
+        """
+        Run a low-priority task only while the user does not interact with the window.
+
+        :param task: a callable or a generator function without arguments.
+        :param priority: task priority. Tasks with lower values are run first.
+
+        Tasks are run in short slices after a period of inactivity
+        (see :class:`IdleScheduler<pyxbmct.idle.IdleScheduler>`). A generator function
+        can ``yield`` between chunks of work to give way to user input immediately.
+        Queued tasks are dropped when the window is closed.
+
+        Example::
+
+            def prefetch_thumbnails(self):
+                for item in self.next_page_items:
+                    warm_thumbnail(item)
+                    yield
+
+            self.runWhenIdle(self.prefetch_thumbnails)
+        """
+        self._getIdleScheduler().add(task, priority)
+
+    def preloadTextures(self, paths, priority=0):
+        """
+        Warm Kodi texture cache for images that will be displayed soon.
+
+        :param paths: a list of image paths or URLs.
+        :param priority: (opt) lower values are preloaded first,
+            e.g. ``0`` for the next page and ``1`` for the page after it.
+        :return: :class:`TexturePreloader<pyxbmct.preload.TexturePreloader>` instance of the window.
+
+        Images are loaded by a small pool of hidden Image controls that is created
+        on the first call. Queued images are dropped when the window is closed.
+
+        Example::
+
+            self.show_page(page)
+            self.preloadTextures(self.get_thumbnails(page + 1))
+            self.preloadTextures(self.get_thumbnails(page - 1), priority=1)
+        """
+        if self._texture_preloader is None:
+            from .preload import TexturePreloader
+            self._texture_preloader = TexturePreloader(self)
+        self._texture_preloader.preload(paths, priority)
+        return self._texture_preloader
+
     def setAnimation(self, control):
         """
         Set animation for control
@@ -669,6 +1341,440 @@ class AbstractWindow:
         """
         pass
 
+    def applySkin(self):
+        """
+        Apply the current skin to the window.
+
+        This method is called automatically for all open windows when the skin is changed
+        with :func:`set_skin` or when properties of the current skin change
+        (e.g. ``pyxbmct.skin.estuary = False``).
+
+        Placed controls that use default skin textures are re-created with the new textures
+        because Kodi controls cannot change textures after creation.
+        Their state (label, text, value, list items and selection) is copied,
+        and window attributes and connections are re-pointed to the new controls.
+        All replaced controls are removed and added in one batch.
+        Window layout is recalculated only if skin geometry has changed.
+        Helpers such as :class:`DataTable<pyxbmct.datatable.DataTable>` re-create
+        their own controls after that.
+
+        .. note:: Navigation set with ``controlUp()`` etc. for re-created controls must be set again.
+        """
+        old_metrics = self._skin_metrics
+        new_metrics = skin.metrics
+        if old_metrics == new_metrics:
+            return
+        self._skin_metrics = new_metrics
+        self._applyFrameSkin(old_metrics, new_metrics)
+        if old_metrics.images != new_metrics.images:
+            self._retextureControls(old_metrics.images, new_metrics.images)
+        for callback in list(self._skin_callbacks):
+            callback(old_metrics, new_metrics)
+
+    def _applyFrameSkin(self, old_metrics, new_metrics):
+        """
+        Apply skin metrics to window frame elements.
+
+        This is a helper method not to be called directly.
+        """
+        pass
+
+    def _retextureControls(self, old_dir, new_dir):
+        """
+        Re-create placed controls that use default textures from ``old_dir``.
+
+        This is a helper method not to be called directly.
+        """
+        old_controls = []
+        new_controls = []
+        for index, control in enumerate(self._placed_controls):
+            args, kwargs = getattr(control, '_init_args', ((), {}))
+            new_kwargs = {key: _replace_images_dir(value, old_dir, new_dir) for key, value in kwargs.items()}
+            if new_kwargs == kwargs or isinstance(control, (Label, FadeLabel, TextBox, Image)):
+                continue
+            new_control = type(control)(*args, **new_kwargs)
+            new_control.setPosition(control.getX(), control.getY())
+            new_control.setWidth(control.getWidth())
+            new_control.setHeight(control.getHeight())
+            self._copyControlState(control, new_control)
+            self._placed_controls[index] = new_control
+            old_controls.append(control)
+            new_controls.append(new_control)
+        if not old_controls:
+            return
+        self.removeControls(old_controls)
+        replacements = dict(zip(map(id, old_controls), new_controls))
+        for name, value in list(vars(self).items()):
+            if id(value) in replacements:
+                setattr(self, name, replacements[id(value)])
+        for connection in self.controls_connected:
+            if id(connection[0]) in replacements:
+                connection[0] = replacements[id(connection[0])]
+        for event, _ in self.focus_connected:
+            if id(event.control) in replacements:
+                event.control = replacements[id(event.control)]
+        self.addControls(new_controls)
+        for event, _ in self.changes_connected:
+            if isinstance(event, SelectionChanged) and id(event.control) in replacements:
+                event.control = replacements[id(event.control)]
+        for control in new_controls:
+            self.setAnimation(control)
+        for old, new in zip(old_controls, new_controls):
+            listeners = getattr(old, '_replace_listeners', None)
+            if listeners:
+                new._replace_listeners = listeners
+                for callback in listeners:
+                    callback(new)
+
+    @staticmethod
+    def _copyControlState(old, new):
+        """
+        Copy user-visible state between controls of the same class.
+
+        This is a helper method not to be called directly.
+        """
+        if isinstance(old, List):
+            size = old.size()
+            new.addItems([old.getListItem(index) for index in range(size)])
+            if size:
+                new.selectItem(old.getSelectedPosition())
+            if hasattr(old, '_multi_selection'):
+                new._multi_selection = old._multi_selection
+        elif isinstance(old, Slider):
+            new.setPercent(old.getPercent())
+        elif isinstance(old, Edit):
+            new.setText(old.getText())
+        else:
+            new.setLabel(old.getLabel())
+            if isinstance(old, RadioButton):
+                new.setSelected(old.isSelected())
+
+    def bindData(self, key, provider, apply, ttl=None, cache=None):
+        """
+        Fill controls from a slow data provider through a stale-while-revalidate cache.
+
+        :param key: cache key for the provider data.
+        :param provider: a function without arguments that returns data, e.g. a database query.
+        :param apply: a function that receives data and updates window controls.
+        :param ttl: (opt) data time-to-live in seconds.
+        :param cache: (opt) :class:`DataCache<pyxbmct.datacache.DataCache>` instance.
+            By default the shared cache of the running addon is used.
+
+        If data for ``key`` are cached, ``apply`` is called immediately with them,
+        so the window can be shown without waiting for the provider.
+        If data are missing or expired, ``provider`` is called in a background thread
+        and ``apply`` is called again only if fresh data differ from the cached ones.
+        Pending ``apply`` calls are dropped when the window is closed.
+
+        Example::
+
+            self.bindData('recent_movies', get_recent_movies, self.fill_movie_list, ttl=600)
+        """
+        if cache is None:
+            from .datacache import get_cache
+            cache = get_cache()
+        self._data_bindings.append((cache, apply))
+        cache.fetch(key, provider, apply, ttl)
+
+    def enableStateRestore(self, key=None, store=None, exclude=()):
+        """
+        Enable saving and restoring window state between window openings.
+
+        :param key: (opt) window identity key. By default the full class name of the window is used.
+        :param store: (opt) :class:`WindowStateStore<pyxbmct.winstate.WindowStateStore>` instance.
+            By default the state is saved in the profile directory of the running addon.
+        :param exclude: (opt) controls which state must not be saved, e.g. password fields.
+
+        When the window is closed, the focused control, :class:`List` selected positions,
+        :class:`Slider` values, :class:`Edit` texts and :class:`RadioButton` states are saved.
+        When the window is opened with ``doModal()`` or ``show()``, the saved state
+        is restored in one pass. Controls are identified by the order
+        they were placed with :meth:`placeControl`, so this method and the layout
+        must be set up before the window is shown.
+
+        Example::
+
+            self.setGeometry(400, 500, 5, 4)
+            self.set_controls()
+            self.enableStateRestore()
+        """
+        if key is None:
+            key = '{}.{}'.format(type(self).__module__, type(self).__qualname__)
+        self._state_key = key
+        if store is None:
+            from .winstate import WindowStateStore
+            store = WindowStateStore()
+        self._state_store = store
+        self._state_exclude = list(exclude)
+        self._state_pending = True
+
+    def getState(self):
+        """
+        Get a snapshot of the window state.
+
+        See :meth:`enableStateRestore` for more info.
+
+        :rtype: dict
+        """
+        controls = []
+        focus = -1
+        try:
+            focus_id = self.getFocusId()
+        except RuntimeError:
+            focus_id = 0
+        exclude = getattr(self, '_state_exclude', ())
+        for index, control in enumerate(self._placed_controls):
+            if focus_id and control.getId() == focus_id:
+                focus = index
+            if any(control is excluded for excluded in exclude):
+                continue
+            if isinstance(control, List):
+                value = control.getSelectedPosition()
+            elif isinstance(control, Slider):
+                value = control.getPercent()
+            elif isinstance(control, Edit):
+                value = control.getText()
+            elif isinstance(control, RadioButton):
+                value = control.isSelected()
+            else:
+                continue
+            controls.append([index, type(control).__name__, value])
+        return {'focus': focus, 'controls': controls}
+
+    def setState(self, state):
+        """
+        Restore the window state from a snapshot returned by :meth:`getState`.
+
+        Controls that do not match the snapshot are skipped.
+
+        :param state: window state snapshot.
+        """
+        placed = self._placed_controls
+        for index, class_name, value in state.get('controls', ()):
+            if index >= len(placed) or type(placed[index]).__name__ != class_name:
+                continue
+            control = placed[index]
+            if isinstance(control, List):
+                if 0 <= value < control.size():
+                    control.selectItem(value)
+            elif isinstance(control, Slider):
+                control.setPercent(value)
+            elif isinstance(control, Edit):
+                control.setText(value)
+            elif isinstance(control, RadioButton):
+                control.setSelected(value)
+        focus = state.get('focus', -1)
+        if 0 <= focus < len(placed):
+            self.setFocus(placed[focus])
+
+    def _restoreState(self):
+        """
+        Restore the saved window state once before the window is shown.
+
+        This is a helper method not to be called directly.
+        """
+        if self._state_key is not None and self._state_pending:
+            self._state_pending = False
+            state = self._state_store.load(self._state_key)
+            if state is not None:
+                self.setState(state)
+
+    def enablePerformanceHUD(self, action=ACTION_SHOW_CODEC, **kwargs):
+        """
+        Enable an on-screen performance overlay toggled by a key action.
+
+        :param action: action code that shows and hides the overlay.
+            By default it is ``ACTION_SHOW_CODEC`` (``O`` key).
+        :param kwargs: overlay position and refresh options,
+            see :class:`PerformanceHUD<pyxbmct.perfhud.PerformanceHUD>`.
+        :return: :class:`PerformanceHUD<pyxbmct.perfhud.PerformanceHUD>` instance
+            that can also be shown and hidden programmatically.
+
+        The overlay is hidden initially. Handler latencies are measured only while it is visible.
+
+        Example::
+
+            self.enablePerformanceHUD()
+        """
+        if self._perf_hud is None:
+            from .perfhud import PerformanceHUD
+            self._perf_hud = PerformanceHUD(self, **kwargs)
+        self.connect(action, self._perf_hud.toggle)
+        return self._perf_hud
+
+    def enableProfiling(self, action=None, directory=None, max_files=5):
+        """
+        Configure cProfile capture of the window session.
+
+        :param action: (opt) action code that starts and stops capture.
+        :param directory: (opt) directory for ``.pstats`` files. By default ``pyxbmct_profiles``
+            in the profile directory of the running addon is used.
+        :param max_files: max number of kept ``.pstats`` files.
+        :return: :class:`ProfileSession<pyxbmct.profiling.ProfileSession>` instance.
+
+        Example::
+
+            self.enableProfiling(action=xbmcgui.ACTION_SHOW_INFO)
+        """
+        if self._profile_session is None:
+            from .profiling import ProfileSession
+            self._profile_session = ProfileSession(directory, max_files)
+        if action is not None:
+            self.connect(action, self.toggleProfiling)
+        return self._profile_session
+
+    def startProfiling(self):
+        """
+        Start cProfile capture.
+
+        Connected event handlers, timer and idle task callbacks and
+        the asyncio event loop thread are profiled until :meth:`stopProfiling` is called.
+        """
+        if self._profiler is not None:
+            return
+        session = self.enableProfiling()
+        session.start()
+        with self._lazy_lock:
+            self._profiler = session
+            if self._timer_wheel is not None:
+                self._timer_wheel.profile_hook = session
+            if self._event_loop_thread is not None:
+                self._event_loop_thread.profile_hook = session
+                self._event_loop_thread.callSoon(session.enableThread)
+
+    def stopProfiling(self):
+        """
+        Stop cProfile capture and write a ``.pstats`` file into the profile directory.
+
+        :return: path to the written file or ``None``.
+        """
+        session = self._profiler
+        if session is None:
+            return None
+        with self._lazy_lock:
+            self._profiler = None
+            if self._timer_wheel is not None:
+                self._timer_wheel.profile_hook = None
+            if self._event_loop_thread is not None:
+                self._event_loop_thread.profile_hook = None
+                self._event_loop_thread.callSoon(session.disableThread)
+        return session.stop()
+
+    def toggleProfiling(self):
+        """Start or stop cProfile capture. When capture is stopped, a summary is shown."""
+        if self._profiler is None:
+            self.startProfiling()
+            xbmcgui.Dialog().notification('PyXBMCt', 'Profiling started', sound=False)
+        elif self.stopProfiling() is not None:
+            self.showProfileSummary()
+
+    def showProfileSummary(self, path=None, limit=20, sort='cumulative'):
+        """
+        Show the hottest functions of a captured profile in a text viewer.
+
+        :param path: (opt) ``.pstats`` file. By default the last written file is used.
+        :param limit: number of functions in the summary.
+        :param sort: ``pstats`` sort key, e.g. ``'cumulative'`` or ``'tottime'``.
+        """
+        text = self.enableProfiling().summary(path, limit, sort)
+        if text:
+            xbmcgui.Dialog().textviewer('PyXBMCt profile', text, usemono=True)
+
+    def enableMemoryTracking(self, top=10, log_file=None):
+        """
+        Enable memory accounting for the window.
+
+        :param top: number of top allocation sites in reports.
+        :param log_file: (opt) path to a file where reports are appended.
+            By default reports are written to the Kodi log.
+
+        The baseline snapshot is taken when this method is called.
+        Reports are written each time ``doModal()`` returns, when the window is torn down
+        with :meth:`teardown` and when the window object is destroyed. To take the baseline snapshot at construction of all windows
+        use :func:`track_windows<pyxbmct.memtrack.track_windows>`.
+        See :class:`MemoryTracker<pyxbmct.memtrack.MemoryTracker>` for more info.
+
+        :return: :class:`MemoryTracker<pyxbmct.memtrack.MemoryTracker>` instance.
+        """
+        if self._memory_tracker is None:
+            from .memtrack import MemoryTracker
+            self._memory_tracker = MemoryTracker(self, top, log_file)
+        return self._memory_tracker
+
+    def doModal(self):
+        """Show the window and wait until it is closed."""
+        self._restoreState()
+        super(AbstractWindow, self).doModal()
+        if self._memory_tracker is not None:
+            self._memory_tracker.report('doModal')
+
+    def show(self):
+        """Show the window."""
+        self._restoreState()
+        super(AbstractWindow, self).show()
+
+    def hide(self):
+        """
+        Close the window and keep its timers, event loop and idle tasks running.
+
+        Use this method instead of :meth:`close` for a window that will be shown again,
+        e.g. a window kept alive by :class:`WindowManager<pyxbmct.windowmanager.WindowManager>`.
+        """
+        if self._state_key is not None:
+            self._state_store.save(self._state_key, self.getState())
+            self._state_pending = True
+        if self._perf_hud is not None:
+            self._perf_hud.hide()
+        super(AbstractWindow, self).close()
+
+    def _stopBackgroundTasks(self):
+        """Stop profiling, the event loop, idle tasks, texture preloading, data refreshes and timers"""
+        self.stopProfiling()
+        if self._event_loop_thread is not None:
+            self._event_loop_thread.stop()
+        if self._idle_scheduler is not None:
+            self._idle_scheduler.clear()
+        if self._texture_preloader is not None:
+            self._texture_preloader.cancel()
+        for cache, apply in self._data_bindings:
+            cache.removeCallback(apply)
+        self._data_bindings = []
+        if self._timer_wheel is not None:
+            self._timer_wheel.stop()
+
+    def close(self):
+        """Close the window."""
+        self._stopBackgroundTasks()
+        self.hide()
+
+    def teardown(self):
+        """
+        Release controls, connected handlers and helpers of a window that will not be shown again.
+
+        Background tasks are stopped as by :meth:`close`. Call this method
+        after the window is closed; the window must not be shown after that.
+        """
+        self._stopBackgroundTasks()
+        for event, _ in self.changes_connected:
+            event._cancelPending()
+        del self.actions_connected[:]
+        del self.controls_connected[:]
+        del self.changes_connected[:]
+        del self.focus_connected[:]
+        self._click_handlers.clear()
+        self._focus_handlers.clear()
+        if self._placed_controls:
+            self.removeControls(self._placed_controls)
+        del self._placed_controls[:]
+        del self._placed_grid[:]
+        del self._skin_callbacks[:]
+        self._perf_hud = None
+        self._event_stats = None
+        self._profile_session = None
+        self._texture_preloader = None
+        if self._memory_tracker is not None:
+            self._memory_tracker.report('teardown')
+
 
 class AddonWindow(AbstractWindow):
 
@@ -702,25 +1808,28 @@ class AddonWindow(AbstractWindow):
 
         This is a helper method not to be called directly.
         """
+        metrics = skin.metrics
         # Window background image
-        self.background_img = skin.background_img
+        self.background_img = metrics.background_img
         # Background for a window header
-        self.title_background_img = skin.title_background_img
+        self.title_background_img = metrics.title_background_img
         self.background = xbmcgui.ControlImage(-10, -10, 1, 1, self.background_img)
         self.addControl(self.background)
         self.setAnimation(self.background)
         self.title_background = xbmcgui.ControlImage(-10, -10, 1, 1, self.title_background_img)
         self.addControl(self.title_background)
         self.setAnimation(self.title_background)
-        self.title_bar = xbmcgui.ControlLabel(-10, -10, 1, 1, title, alignment=skin.header_align,
-                                              textColor=skin.header_text_color, font='font13_title')
+        self.title_bar = xbmcgui.ControlLabel(-10, -10, 1, 1, title, alignment=metrics.header_align,
+                                              textColor=metrics.header_text_color, font='font13_title')
         self.addControl(self.title_bar)
         self.setAnimation(self.title_bar)
-        self.window_close_button = xbmcgui.ControlButton(-100, -100, skin.close_btn_width, skin.close_btn_height, '',
-                        focusTexture=skin.close_button_focus,
-                        noFocusTexture=skin.close_button_no_focus)
+        self.window_close_button = xbmcgui.ControlButton(-100, -100, metrics.close_btn_width,
+                                                         metrics.close_btn_height, '',
+                                                         focusTexture=metrics.close_button_focus,
+                                                         noFocusTexture=metrics.close_button_no_focus)
         self.addControl(self.window_close_button)
         self.setAnimation(self.window_close_button)
+        self._close_button_id = self.window_close_button.getId()
 
     def setGeometry(self, width_, height_, rows_, columns_, pos_x=-1, pos_y=-1, padding=5):
         """
@@ -744,18 +1853,20 @@ class AddonWindow(AbstractWindow):
         """
         self.win_padding = padding
         super(AddonWindow, self).setGeometry(width_, height_, rows_, columns_, pos_x, pos_y)
+        metrics = skin.metrics
         self.background.setPosition(self.x, self.y)
         self.background.setWidth(self.width)
         self.background.setHeight(self.height)
-        self.title_background.setPosition(self.x + skin.x_margin, self.y + skin.y_margin + skin.title_back_y_shift)
-        self.title_background.setWidth(self.width - 2 * skin.x_margin)
-        self.title_background.setHeight(skin.header_height)
-        self.title_bar.setPosition(self.x + skin.x_margin + skin.title_bar_x_shift,
-                                   self.y + skin.y_margin + skin.title_bar_y_shift)
-        self.title_bar.setWidth(self.width - 2 * skin.x_margin)
-        self.title_bar.setHeight(skin.header_height)
-        self.window_close_button.setPosition(self.x + self.width - skin.close_btn_x_offset,
-                                             self.y + skin.y_margin + skin.close_btn_y_offset)
+        self.title_background.setPosition(self.x + metrics.x_margin,
+                                          self.y + metrics.y_margin + metrics.title_back_y_shift)
+        self.title_background.setWidth(self.width - 2 * metrics.x_margin)
+        self.title_background.setHeight(metrics.header_height)
+        self.title_bar.setPosition(self.x + metrics.x_margin + metrics.title_bar_x_shift,
+                                   self.y + metrics.y_margin + metrics.title_bar_y_shift)
+        self.title_bar.setWidth(self.width - 2 * metrics.x_margin)
+        self.title_bar.setHeight(metrics.header_height)
+        self.window_close_button.setPosition(self.x + self.width - metrics.close_btn_x_offset,
+                                             self.y + metrics.y_margin + metrics.close_btn_y_offset)
 
     def _setGrid(self):
         """
@@ -763,11 +1874,56 @@ class AddonWindow(AbstractWindow):
 
         This is a helper method not to be called directly.
         """
-        self.grid_x = self.x + skin.x_margin + self.win_padding
-        self.grid_y = self.y + skin.y_margin + skin.title_back_y_shift + skin.header_height + self.win_padding
-        self.tile_width = (self.width - 2 * (skin.x_margin + self.win_padding)) // self.columns
-        self.tile_height = ((self.height - skin.header_height - skin.title_back_y_shift -
-                             2 * (skin.y_margin + self.win_padding)) // self.rows)
+        metrics = skin.metrics
+        self.grid_x = self.x + metrics.x_margin + self.win_padding
+        self.grid_y = (self.y + metrics.y_margin + metrics.title_back_y_shift + metrics.header_height +
+                       self.win_padding)
+        self.tile_width = (self.width - 2 * (metrics.x_margin + self.win_padding)) // self.columns
+        self.tile_height = ((self.height - metrics.header_height - metrics.title_back_y_shift -
+                             2 * (metrics.y_margin + self.win_padding)) // self.rows)
+
+    def _applyFrameSkin(self, old_metrics, new_metrics):
+        """
+        Apply skin metrics to window frame elements and re-layout if needed.
+
+        This is a helper method not to be called directly.
+        """
+        self.background_img = new_metrics.background_img
+        self.background.setImage(self.background_img)
+        self.title_background_img = new_metrics.title_background_img
+        self.title_background.setImage(self.title_background_img)
+        if (old_metrics.header_text_color != new_metrics.header_text_color or
+                old_metrics.header_align != new_metrics.header_align):
+            # ControlLabel colour and alignment cannot be changed after creation
+            old_title = self.title_bar
+            self.title_bar = xbmcgui.ControlLabel(old_title.getX(), old_title.getY(),
+                                                  old_title.getWidth(), old_title.getHeight(),
+                                                  old_title.getLabel(), alignment=new_metrics.header_align,
+                                                  textColor=new_metrics.header_text_color, font='font13_title')
+            self.removeControl(old_title)
+            self.addControl(self.title_bar)
+            self.setAnimation(self.title_bar)
+        if (old_metrics.close_button_focus != new_metrics.close_button_focus or
+                old_metrics.close_button_no_focus != new_metrics.close_button_no_focus or
+                old_metrics.close_btn_width != new_metrics.close_btn_width or
+                old_metrics.close_btn_height != new_metrics.close_btn_height):
+            old_button = self.window_close_button
+            self.window_close_button = xbmcgui.ControlButton(old_button.getX(), old_button.getY(),
+                                                             new_metrics.close_btn_width,
+                                                             new_metrics.close_btn_height, '',
+                                                             focusTexture=new_metrics.close_button_focus,
+                                                             noFocusTexture=new_metrics.close_button_no_focus)
+            self.removeControl(old_button)
+            self.addControl(self.window_close_button)
+            self.setAnimation(self.window_close_button)
+            self._close_button_id = self.window_close_button.getId()
+        geometry = ('x_margin', 'y_margin', 'title_bar_x_shift', 'title_bar_y_shift', 'title_back_y_shift',
+                    'header_height', 'close_btn_x_offset', 'close_btn_y_offset')
+        if hasattr(self, 'width') and any(getattr(old_metrics, name) != getattr(new_metrics, name)
+                                          for name in geometry):
+            self.setGeometry(self.width, self.height, self.rows, self.columns, self.x, self.y, self.win_padding)
+            for control, grid in zip(self._placed_controls, self._placed_grid):
+                self._setControlRect(control, grid)
 
     def setWindowTitle(self, title=''):
         """
@@ -797,10 +1953,13 @@ class FullWindowMixin(xbmcgui.Window):
 
         ``action`` is an instance of :class:`xbmcgui.Action` class.
         """
+        self._registerInput()
         if action == ACTION_PREVIOUS_MENU:
             self.close()
         else:
             self._executeConnected(action, self.actions_connected)
+            self._checkFocus()
+            self._checkChanges()
 
     def onControl(self, control):
         """
@@ -808,11 +1967,7 @@ class FullWindowMixin(xbmcgui.Window):
 
         ``control`` is an instance of :class:`xbmcgui.Control` class.
         """
-        if (hasattr(self, 'window_close_button') and
-                control.getId() == self.window_close_button.getId()):
-            self.close()
-        else:
-            self._executeConnected(control, self.controls_connected)
+        self._dispatchClick(control.getId())
 
 
 class DialogWindowMixin(xbmcgui.WindowDialog):
@@ -825,10 +1980,13 @@ class DialogWindowMixin(xbmcgui.WindowDialog):
 
         ``action`` is an instance of class:`xbmcgui.Action` class.
         """
+        self._registerInput()
         if action == ACTION_PREVIOUS_MENU:
             self.close()
         else:
             self._executeConnected(action, self.actions_connected)
+            self._checkFocus()
+            self._checkChanges()
 
     def onControl(self, control):
         """
@@ -836,11 +1994,7 @@ class DialogWindowMixin(xbmcgui.WindowDialog):
 
         ``control`` is an instance of :class:`xbmcgui.Control` class.
         """
-        if (hasattr(self, 'window_close_button') and
-                control.getId() == self.window_close_button.getId()):
-            self.close()
-        else:
-            self._executeConnected(control, self.controls_connected)
+        self._dispatchClick(control.getId())
 
 
 class BlankFullWindow(AbstractWindow, FullWindowMixin):
@@ -894,12 +2048,23 @@ class AddonFullWindow(AddonWindow, FullWindowMixin):
         Set the image for for the fullscreen background.
         """
         # Image for the fullscreen background.
-        self.main_bg_img = skin.main_bg_img
+        self.main_bg_img = skin.metrics.main_bg_img
         # Fullscreen background image control.
         self.main_bg = xbmcgui.ControlImage(1, 1, 1280, 720, self.main_bg_img)
         self.addControl(self.main_bg)
         super(AddonFullWindow, self)._setFrame(title)
 
+    def _applyFrameSkin(self, old_metrics, new_metrics):
+        """
+        Apply skin metrics to window frame elements and re-layout if needed.
+
+        This is a helper method not to be called directly.
+        """
+        if self.main_bg_img == old_metrics.main_bg_img:
+            self.main_bg_img = new_metrics.main_bg_img
+            self.main_bg.setImage(self.main_bg_img)
+        super(AddonFullWindow, self)._applyFrameSkin(old_metrics, new_metrics)
+
     def setBackground(self, image=''):
         """
         Set the main bacground to an image file.
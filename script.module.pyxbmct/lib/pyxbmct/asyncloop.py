@@ -0,0 +1,132 @@
+# coding: utf-8
+# Module: asyncloop
+# Licence: GPL v.3 <http://www.gnu.org/licenses/gpl.html>
+"""asyncio event loop running in a background thread"""
+
+import asyncio
+import threading
+
+import xbmc
+
+__all__ = ['EventLoopThread']
+
+
+class EventLoopThread:
+    """
+    EventLoopThread()
+
+    An asyncio event loop that runs in a daemon thread
+
+    The thread is started on the first :meth:`submit` call.
+    :meth:`stop` cancels all outstanding tasks and stops the thread.
+    After that the loop can be started again by another :meth:`submit` call.
+
+    PyXBMCt windows use this class to run coroutine functions connected
+    with :meth:`AbstractWindow.connect<pyxbmct.addonwindow.AbstractWindow.connect>`.
+
+    Example::
+
+        loop_thread = EventLoopThread()
+        future = loop_thread.submit(fetch_page(1))
+        ...
+        loop_thread.stop()
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._tasks = set()
+        self.profile_hook = None
+        """:class:`ProfileSession<pyxbmct.profiling.ProfileSession>` that profiles the loop thread or ``None``"""
+
+    def isRunning(self):
+        """Check if the event loop thread is running."""
+        return self._thread is not None
+
+    def _start(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._run, args=(self._loop,))
+                self._thread.daemon = True
+                self._thread.start()
+            return self._loop
+
+    @staticmethod
+    def _run(loop):
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_forever()
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            loop.close()
+
+    async def _wrap(self, coro):
+        task = asyncio.current_task()
+        self._tasks.add(task)
+        hook = self.profile_hook
+        if hook is not None:
+            hook.enableThread()
+        try:
+            return await coro
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            xbmc.log('pyxbmct: async handler {!r} failed: {!r}'.format(coro, exc), xbmc.LOGERROR)
+            raise
+        finally:
+            self._tasks.discard(task)
+
+    def submit(self, coro):
+        """
+        Schedule a coroutine on the event loop.
+
+        :param coro: coroutine object.
+        :return: :class:`concurrent.futures.Future` instance for the coroutine result.
+        """
+        loop = self._start()
+        return asyncio.run_coroutine_threadsafe(self._wrap(coro), loop)
+
+    def callSoon(self, callback, *args):
+        """
+        Call a function in the event loop thread.
+
+        :param callback: a function to be called.
+        :param args: positional arguments for the function.
+        :return: ``True`` if the call is scheduled, ``False`` if the loop is not running.
+        :rtype: bool
+        """
+        with self._lock:
+            loop = self._loop
+        if loop is None:
+            return False
+        loop.call_soon_threadsafe(callback, *args)
+        return True
+
+    def pendingTasks(self):
+        """
+        Get the number of outstanding tasks.
+
+        :rtype: int
+        """
+        return len(self._tasks)
+
+    def stop(self, timeout=1.0):
+        """
+        Cancel outstanding tasks and stop the event loop thread.
+
+        :param timeout: max time in seconds to wait for the thread to finish.
+        """
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not threading.current_thread():
+            thread.join(timeout)
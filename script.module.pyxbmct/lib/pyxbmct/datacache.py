@@ -0,0 +1,234 @@
+# coding: utf-8
+# Module: datacache
+# Licence: GPL v.3 <http://www.gnu.org/licenses/gpl.html>
+"""Stale-while-revalidate cache for window content providers"""
+
+import hashlib
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+import xbmc
+import xbmcvfs
+from xbmcaddon import Addon
+
+__all__ = ['DataCache', 'get_cache']
+
+
+class DataCache:
+    """
+    DataCache(path=None, max_items=256, max_disk_size=16 * 1024 * 1024, ttl=300)
+
+    Two-tier data cache with stale-while-revalidate semantics
+
+    Values are kept in an in-memory LRU tier and pickled to an on-disk tier,
+    so they survive between addon runs. Expired values are not dropped:
+    they are still returned by :meth:`fetch` while a fresh value is loaded
+    in a background thread.
+
+    :param path: cache directory. By default ``pyxbmct_cache`` in the profile directory
+        of the running addon is used. If an empty string is passed, the disk tier is disabled.
+    :param max_items: max number of values in the memory tier.
+    :param max_disk_size: max size of the disk tier in bytes.
+    :param ttl: default time-to-live of cached values in seconds.
+
+    Example::
+
+        cache = DataCache()
+
+        def apply_movies(movies):
+            ...
+
+        cache.fetch('movies', get_movies_from_db, apply_movies)
+    """
+    def __init__(self, path=None, max_items=256, max_disk_size=16 * 1024 * 1024, ttl=300):
+        if path is None:
+            profile = xbmcvfs.translatePath(Addon().getAddonInfo('profile'))
+            path = os.path.join(profile, 'pyxbmct_cache')
+        self.path = path
+        self.max_items = max_items
+        self.max_disk_size = max_disk_size
+        self.ttl = ttl
+        self._memory = OrderedDict()
+        self._lock = threading.RLock()
+        self._in_flight = {}
+
+    def _file(self, key):
+        return os.path.join(self.path, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.pickle')
+
+    def _get_entry(self, key):
+        """Get ``(expires, value)`` tuple from the memory or disk tier"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry
+        if not self.path:
+            return None
+        try:
+            with open(self._file(key), 'rb') as fo:
+                entry = pickle.load(fo)
+        except (IOError, OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return None
+        self._store_memory(key, entry)
+        return entry
+
+    def _store_memory(self, key, entry):
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_items:
+                self._memory.popitem(last=False)
+
+    def get(self, key, default=None, allow_stale=False):
+        """
+        Get a cached value.
+
+        :param key: cache key.
+        :param default: a value returned if the key is not cached.
+        :param allow_stale: if ``True``, return expired values too.
+        """
+        entry = self._get_entry(key)
+        if entry is None or (not allow_stale and entry[0] < time.time()):
+            return default
+        return entry[1]
+
+    def set(self, key, value, ttl=None):
+        """
+        Store a value in the cache.
+
+        :param key: cache key.
+        :param value: picklable value.
+        :param ttl: time-to-live in seconds. By default ``self.ttl`` is used.
+        """
+        entry = (time.time() + (self.ttl if ttl is None else ttl), value)
+        self._store_memory(key, entry)
+        if not self.path:
+            return
+        try:
+            if not os.path.exists(self.path):
+                os.makedirs(self.path)
+            file_path = self._file(key)
+            temp_path = file_path + '.tmp'
+            with open(temp_path, 'wb') as fo:
+                pickle.dump(entry, fo, pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, file_path)
+            self._trim_disk()
+        except (IOError, OSError, pickle.PicklingError) as exc:
+            xbmc.log('pyxbmct: unable to write cache entry {}: {}'.format(key, exc), xbmc.LOGWARNING)
+
+    def _trim_disk(self):
+        """Remove the least recently written files if the disk tier exceeds its size limit"""
+        files = [entry for entry in os.scandir(self.path) if entry.name.endswith('.pickle')]
+        total = sum(entry.stat().st_size for entry in files)
+        if total <= self.max_disk_size:
+            return
+        files.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in files:
+            if total <= self.max_disk_size:
+                break
+            total -= entry.stat().st_size
+            os.remove(entry.path)
+
+    def delete(self, key):
+        """
+        Remove a value from the cache.
+
+        :param key: cache key.
+        """
+        with self._lock:
+            self._memory.pop(key, None)
+        if self.path:
+            try:
+                os.remove(self._file(key))
+            except OSError:
+                pass
+
+    def fetch(self, key, provider, callback, ttl=None):
+        """
+        Pass a cached value to a callback and refresh it in the background if it is missing or expired.
+
+        :param key: cache key.
+        :param provider: a function without arguments that returns a fresh value.
+        :param callback: a function that receives a value. It is called immediately
+            with a cached value (even an expired one) and then from a background thread
+            with a fresh value if it differs from the cached one.
+        :param ttl: time-to-live in seconds. By default ``self.ttl`` is used.
+        :return: a cached value (possibly stale) or ``None`` if the key is not cached.
+
+        The call never waits for ``provider``.
+        """
+        entry = self._get_entry(key)
+        current = None
+        if entry is not None:
+            current = entry[1]
+            callback(current)
+            if entry[0] >= time.time():
+                return current
+        self.refresh(key, provider, callback, ttl, current)
+        return current
+
+    def refresh(self, key, provider, callback=None, ttl=None, current=None):
+        """
+        Load a fresh value in a background thread.
+
+        If a refresh of the same key is already running, no new thread is started
+        and ``callback`` is called with the value of the running refresh.
+
+        :param key: cache key.
+        :param provider: a function without arguments that returns a fresh value.
+        :param callback: a function that receives a fresh value when it differs from ``current``.
+        :param ttl: time-to-live in seconds.
+        :param current: a value currently displayed.
+        """
+        with self._lock:
+            waiting = self._in_flight.get(key)
+            if waiting is not None:
+                if callback is not None:
+                    waiting.append((callback, current))
+                return
+            self._in_flight[key] = [(callback, current)] if callback is not None else []
+        thread = threading.Thread(target=self._refresh, args=(key, provider, ttl))
+        thread.daemon = True
+        thread.start()
+
+    def _refresh(self, key, provider, ttl):
+        try:
+            value = provider()
+            self.set(key, value, ttl)
+        except Exception as exc:
+            xbmc.log('pyxbmct: provider for {} failed: {}'.format(key, exc), xbmc.LOGERROR)
+            return
+        finally:
+            with self._lock:
+                waiting = self._in_flight.pop(key)
+        for callback, current in waiting:
+            if value != current:
+                callback(value)
+
+    def removeCallback(self, callback):
+        """
+        Remove a callback from all running refreshes, e.g. when its window is closed.
+
+        :param callback: a function passed to :meth:`fetch` or :meth:`refresh`.
+        """
+        with self._lock:
+            for waiting in self._in_flight.values():
+                waiting[:] = [item for item in waiting if item[0] != callback]
+
+
+_cache = None
+
+
+def get_cache():
+    """
+    Get the shared :class:`DataCache` instance of the running addon
+
+    :rtype: DataCache
+    """
+    global _cache
+    if _cache is None:
+        _cache = DataCache()
+    return _cache
@@ -0,0 +1,422 @@
+# coding: utf-8
+# Module: datatable
+# Licence: GPL v.3 <http://www.gnu.org/licenses/gpl.html>
+"""Scrollable and sortable table of text cells with a fixed pool of controls"""
+
+import os
+
+from . import addonwindow
+from .addonwindow import (Button, Label, Image, ALIGN_LEFT, ALIGN_CENTER_Y, ACTION_MOVE_UP, ACTION_MOVE_DOWN,
+                          ACTION_PAGE_UP, ACTION_PAGE_DOWN, ACTION_MOUSE_WHEEL_UP, ACTION_MOUSE_WHEEL_DOWN)
+from .listmodel import collation_key
+
+__all__ = ['TableColumn', 'DataTable']
+
+TEXT_COLOR = '0xFFFFFFFF'
+
+
+class TableColumn:
+    """
+    TableColumn(title, weight=1, key=None, formatter=str, alignment=ALIGN_LEFT)
+
+    A column of :class:`DataTable`
+
+    :param title: column header.
+    :param weight: relative column width. The table width is split between columns
+        proportionally to their weights.
+    :param key: a column index or a dict key in a data row, or a function that receives
+        a row and returns a cell value. By default the column position is used as an index.
+    :param formatter: a function that converts a cell value to text.
+    :param alignment: cell text alignment.
+    """
+    __slots__ = ('title', 'weight', 'key', 'formatter', 'alignment')
+
+    def __init__(self, title, weight=1, key=None, formatter=str, alignment=ALIGN_LEFT):
+        self.title = title
+        self.weight = weight
+        self.key = key
+        self.formatter = formatter
+        self.alignment = alignment
+
+    def getValue(self, row):
+        """
+        Get a cell value from a data row.
+
+        :param row: data row.
+        """
+        if callable(self.key):
+            return self.key(row)
+        return row[self.key]
+
+
+class DataTable:
+    """
+    DataTable(window, columns, row, column, rowspan=1, columnspan=1, line_height=30, font=None, header=True, pad_x=5, pad_y=5)
+
+    A table that occupies a range of window grid cells
+
+    The table keeps a fixed pool of :class:`Label<pyxbmct.addonwindow.Label>` controls,
+    one per cell of the rows that fit into the table area, so the number of controls
+    does not depend on the number of data rows. Scrolling and sorting only change
+    the text of the pooled labels, and a label is updated only if its text changes.
+    The selected row is marked with a highlight image behind it that is moved
+    to the selected line.
+    Column widths are computed once per window geometry. Header cells
+    are :class:`Button<pyxbmct.addonwindow.Button>` controls that sort the table
+    by their column when clicked. When the skin textures change, the table controls
+    are re-created with the new textures, and navigation set for header buttons
+    must be set again.
+
+    Sorting uses collation keys that are computed once per column
+    and a row permutation that is cached per sort column.
+
+    :param window: PyXBMCt window instance with a grid set with ``setGeometry``.
+    :param columns: a list of :class:`TableColumn` instances or column titles.
+    :param row: grid row of the table top left corner.
+    :param column: grid column of the table top left corner.
+    :param rowspan: number of grid rows the table occupies.
+    :param columnspan: number of grid columns the table occupies.
+    :param line_height: height of a table row.
+    :param font: (opt) cell font.
+    :param header: show a header row.
+    :param pad_x: horizontal padding of the table area.
+    :param pad_y: vertical padding of the table area.
+
+    Example::
+
+        self.table = DataTable(self, [TableColumn('Name', 3, 'name'),
+                                      TableColumn('Size', 1, 'size', format_size, ALIGN_RIGHT)],
+                               0, 0, 6, 4)
+        self.table.setRows(files)
+        self.table.bindActions()
+    """
+    def __init__(self, window, columns, row, column, rowspan=1, columnspan=1, line_height=30, font=None,
+                 header=True, pad_x=5, pad_y=5):
+        self._window = window
+        self.columns = [col if isinstance(col, TableColumn) else TableColumn(col, key=index)
+                        for index, col in enumerate(columns)]
+        for index, col in enumerate(self.columns):
+            if col.key is None:
+                col.key = index
+        self._cell = (row, column, rowspan, columnspan, pad_x, pad_y)
+        self.line_height = line_height
+        self.font = font
+        self.header = header
+        self._rows = []
+        self._keys = {}
+        self._permutations = {}
+        self._order = None
+        self._sort_column = None
+        self._reverse = False
+        self._top = 0
+        self._selected = 0
+        self._geometry = None
+        self._header_cells = []
+        self._cells = []
+        self._texts = []
+        self._highlight = None
+        self._highlight_line = None
+        self._top_y = 0
+        self.layout()
+        window._skin_callbacks.append(self._applySkin)
+
+    def _area(self):
+        """Get the table rectangle in window coordinates"""
+        window = self._window
+        row, column, rowspan, columnspan, pad_x, pad_y = self._cell
+        x = window.grid_x + window.tile_width * column + pad_x
+        y = window.grid_y + window.tile_height * row + pad_y
+        width = window.tile_width * columnspan - 2 * pad_x
+        height = window.tile_height * rowspan - 2 * pad_y
+        return x, y, width, height
+
+    def layout(self):
+        """
+        Compute column widths and position the controls.
+
+        Call this method after the window geometry is changed with ``setGeometry``.
+        Nothing is done if the geometry has not changed. The label pool
+        is re-created only if the number of visible rows changes.
+        """
+        geometry = self._area()
+        if geometry == self._geometry:
+            return
+        self._geometry = geometry
+        x, y, width, height = geometry
+        total_weight = float(sum(col.weight for col in self.columns)) or 1.0
+        lefts = []
+        widths = []
+        left = x
+        for index, col in enumerate(self.columns):
+            if index == len(self.columns) - 1:
+                col_width = x + width - left
+            else:
+                col_width = int(width * col.weight / total_weight)
+            lefts.append(left)
+            widths.append(col_width)
+            left += col_width
+        lines = max(1, height // self.line_height - (1 if self.header else 0))
+        if lines * len(self.columns) != len(self._cells) or (self.header and not self._header_cells):
+            self._createPool(lines)
+        self._highlight.setWidth(width)
+        self._highlight.setHeight(self.line_height)
+        top = y
+        if self.header:
+            for cell, left, col_width in zip(self._header_cells, lefts, widths):
+                cell.setPosition(left, top)
+                cell.setWidth(col_width)
+                cell.setHeight(self.line_height)
+            top += self.line_height
+        n_columns = len(self.columns)
+        for index, cell in enumerate(self._cells):
+            line, col_index = divmod(index, n_columns)
+            cell.setPosition(lefts[col_index], top + line * self.line_height)
+            cell.setWidth(widths[col_index])
+            cell.setHeight(self.line_height)
+        self.lines = lines
+        self._top_y = top
+        self._highlight.setVisible(False)
+        self._highlight_line = None
+        self._scrollTo(self._top)
+
+    def _createPool(self, lines):
+        """Create header buttons, the selection highlight and cell labels"""
+        window = self._window
+        old = self._header_cells + self._cells
+        if old:
+            window.disconnectEventList(self._header_cells)
+            window.removeControls(old + [self._highlight])
+        self._header_cells = []
+        if self.header:
+            for col in self.columns:
+                button = Button(col.title, font=self.font, alignment=col.alignment | ALIGN_CENTER_Y)
+                self._header_cells.append(button)
+        self._cells = []
+        for _ in range(lines):
+            for col in self.columns:
+                self._cells.append(Label('', font=self.font, textColor=TEXT_COLOR,
+                                         alignment=col.alignment | ALIGN_CENTER_Y))
+        self._texts = [''] * len(self._cells)
+        # Controls added later are drawn on top, so the highlight goes before the labels
+        self._highlight = Image(os.path.join(addonwindow.skin.metrics.images, 'List', 'MenuItemFO.png'))
+        self._highlight.setVisible(False)
+        window.addControls(self._header_cells + [self._highlight] + self._cells)
+        for index, button in enumerate(self._header_cells):
+            window.connect(button, lambda index=index: self.toggleSort(index))
+
+    def _applySkin(self, old_metrics, new_metrics):
+        """Re-create the control pool if skin textures have changed"""
+        if old_metrics.images == new_metrics.images:
+            return
+        # Kodi controls cannot change textures, and re-adding only the header and the highlight
+        # would draw the highlight over the labels
+        self._createPool(self.lines)
+        self._geometry = None
+        self.layout()
+
+    def getHeaderButtons(self):
+        """
+        Get header buttons, e.g. to set navigation between them and other controls.
+
+        :rtype: list
+        """
+        return list(self._header_cells)
+
+    def setRows(self, rows):
+        """
+        Replace table data.
+
+        :param rows: a sequence of data rows. Each row is a sequence or a dict.
+        """
+        self._rows = rows if isinstance(rows, list) else list(rows)
+        self._keys = {}
+        self._permutations = {}
+        self._selected = 0
+        self._applyOrder()
+        self._scrollTo(0)
+
+    def size(self):
+        """
+        Get the number of data rows.
+
+        :rtype: int
+        """
+        return len(self._rows)
+
+    def _permutation(self, col_index):
+        permutation = self._permutations.get(col_index)
+        if permutation is None:
+            keys = self._keys.get(col_index)
+            if keys is None:
+                column = self.columns[col_index]
+                keys = self._keys[col_index] = [collation_key(column.getValue(row)) for row in self._rows]
+            permutation = self._permutations[col_index] = sorted(range(len(keys)), key=keys.__getitem__)
+        return permutation
+
+    def _applyOrder(self):
+        if self._sort_column is None:
+            self._order = None
+        else:
+            self._order = self._permutation(self._sort_column)
+
+    def _rowIndex(self, position):
+        """Get a data row index by table position"""
+        if self._order is None:
+            return position
+        if self._reverse:
+            return self._order[len(self._order) - 1 - position]
+        return self._order[position]
+
+    def sortBy(self, col_index, reverse=False):
+        """
+        Sort the table by a column.
+
+        :param col_index: column index or ``None`` to restore data order.
+        :param reverse: sort in descending order.
+
+        The selected row stays selected.
+        """
+        selected_row = self.getSelectedRowIndex()
+        self._sort_column = col_index
+        self._reverse = reverse
+        self._applyOrder()
+        if selected_row >= 0:
+            if self._order is None:
+                position = selected_row
+            else:
+                position = self._order.index(selected_row)
+                if reverse:
+                    position = len(self._order) - 1 - position
+            self.select(position)
+        else:
+            self._render()
+
+    def toggleSort(self, col_index):
+        """
+        Sort by a column in ascending order or reverse the order if the table is already sorted by it.
+
+        :param col_index: column index.
+        """
+        reverse = not self._reverse if col_index == self._sort_column else False
+        self.sortBy(col_index, reverse)
+
+    def getSortOrder(self):
+        """
+        Get the current sort order.
+
+        :return: a tuple of a column index and reverse flag or ``(None, False)``
+            if the table is not sorted.
+        :rtype: tuple
+        """
+        return self._sort_column, self._reverse
+
+    def _scrollTo(self, top):
+        max_top = max(0, len(self._rows) - self.lines)
+        self._top = min(max(0, top), max_top)
+        self._render()
+
+    def scroll(self, delta):
+        """
+        Scroll the table without moving the selection.
+
+        :param delta: number of rows, negative values scroll up.
+        """
+        self._scrollTo(self._top + delta)
+
+    def select(self, position):
+        """
+        Select a row and scroll it into view.
+
+        :param position: row position in the table.
+        """
+        if not self._rows:
+            return
+        position = min(max(0, position), len(self._rows) - 1)
+        self._selected = position
+        if position < self._top:
+            self._scrollTo(position)
+        elif position >= self._top + self.lines:
+            self._scrollTo(position - self.lines + 1)
+        else:
+            self._render()
+
+    def moveSelection(self, delta):
+        """
+        Move the selection.
+
+        :param delta: number of rows, negative values move up.
+        """
+        self.select(self._selected + delta)
+
+    def getSelectedPosition(self):
+        """
+        Get the table position of the selected row.
+
+        :return: row position or -1 if the table is empty.
+        :rtype: int
+        """
+        return self._selected if self._rows else -1
+
+    def getSelectedRowIndex(self):
+        """
+        Get the data index of the selected row.
+
+        :return: row index or -1 if the table is empty.
+        :rtype: int
+        """
+        return self._rowIndex(self._selected) if self._rows else -1
+
+    def getSelectedRow(self):
+        """
+        Get the selected data row.
+
+        :return: data row or ``None`` if the table is empty.
+        """
+        index = self.getSelectedRowIndex()
+        return self._rows[index] if index >= 0 else None
+
+    def bindActions(self):
+        """
+        Connect window navigation actions to the table.
+
+        Up/down and mouse wheel actions move the selection, page up/down actions
+        move it by a page. Use this method if the table is the main view of a window.
+        """
+        window = self._window
+        window.connect(ACTION_MOVE_UP, lambda: self.moveSelection(-1))
+        window.connect(ACTION_MOVE_DOWN, lambda: self.moveSelection(1))
+        window.connect(ACTION_MOUSE_WHEEL_UP, lambda: self.moveSelection(-1))
+        window.connect(ACTION_MOUSE_WHEEL_DOWN, lambda: self.moveSelection(1))
+        window.connect(ACTION_PAGE_UP, lambda: self.moveSelection(-self.lines))
+        window.connect(ACTION_PAGE_DOWN, lambda: self.moveSelection(self.lines))
+
+    def _render(self):
+        """Rebind pooled labels to visible rows and move the selection highlight"""
+        cells = self._cells
+        if not cells:
+            return
+        texts = self._texts
+        columns = self.columns
+        n_columns = len(columns)
+        rows = self._rows
+        for line in range(self.lines):
+            position = self._top + line
+            row = rows[self._rowIndex(position)] if position < len(rows) else None
+            base = line * n_columns
+            for col_index, column in enumerate(columns):
+                text = '' if row is None else column.formatter(column.getValue(row))
+                index = base + col_index
+                if text != texts[index]:
+                    texts[index] = text
+                    cells[index].setLabel(text)
+        line = self._selected - self._top
+        if not rows or not 0 <= line < self.lines:
+            line = None
+        if line != self._highlight_line:
+            if line is None:
+                self._highlight.setVisible(False)
+            else:
+                self._highlight.setPosition(self._geometry[0], self._top_y + line * self.line_height)
+                if self._highlight_line is None:
+                    self._highlight.setVisible(True)
+            self._highlight_line = line
@@ -0,0 +1,151 @@
+# coding: utf-8
+# Module: idle
+# Licence: GPL v.3 <http://www.gnu.org/licenses/gpl.html>
+"""Deferred low-priority tasks that run only while the user is idle"""
+
+import heapq
+import itertools
+import threading
+import time
+import types
+
+import xbmc
+
+__all__ = ['IdleScheduler']
+
+
+class IdleScheduler:
+    """
+    IdleScheduler(timer_wheel, idle_delay=1.0, slice_time=0.03, poll_interval=0.2)
+
+    A queue of low-priority tasks that are run only during user inactivity
+
+    User input is reported with :meth:`touch`. Tasks are run when no input
+    has been received for ``idle_delay`` seconds, in short slices
+    of at most ``slice_time`` seconds, so a slice never delays reaction
+    to user input for long.
+
+    A task is either a plain callable or a generator function. A generator task
+    is resumed step by step: each ``yield`` is a point where the task gives up
+    its slice as soon as new input arrives, and it is resumed from there
+    in the next idle gap. A plain callable is run in one step.
+
+    :param timer_wheel: :class:`TimerWheel<pyxbmct.timers.TimerWheel>` instance
+        that drives the scheduler.
+    :param idle_delay: inactivity time in seconds after which tasks are run.
+    :param slice_time: max run time of one slice in seconds.
+    :param poll_interval: idle check interval in seconds.
+
+    Tasks can be added from any thread. They are run in the timer wheel thread.
+
+    PyXBMCt windows own an idle scheduler that receives all window actions,
+    see :meth:`AbstractWindow.runWhenIdle<pyxbmct.addonwindow.AbstractWindow.runWhenIdle>`.
+    """
+    def __init__(self, timer_wheel, idle_delay=1.0, slice_time=0.03, poll_interval=0.2):
+        self.idle_delay = idle_delay
+        self.slice_time = slice_time
+        self.poll_interval = poll_interval
+        self._timer_wheel = timer_wheel
+        self._timer = None
+        self._queue = []
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._last_input = time.monotonic()
+
+    def touch(self):
+        """Register user input."""
+        self._last_input = time.monotonic()
+
+    def getIdleTime(self):
+        """
+        Get time since the last user input.
+
+        :return: idle time in seconds.
+        :rtype: float
+        """
+        return time.monotonic() - self._last_input
+
+    def add(self, task, priority=0):
+        """
+        Add a task to the queue.
+
+        :param task: a callable or a generator function without arguments,
+            or a generator object.
+        :param priority: task priority. Tasks with lower values are run first.
+        """
+        with self._lock:
+            heapq.heappush(self._queue, (priority, next(self._counter), task))
+            if self._timer is None:
+                self._timer = self._timer_wheel.call_every(self.poll_interval, self._run_slice)
+
+    def pendingTasks(self):
+        """
+        Get the number of queued tasks.
+
+        :rtype: int
+        """
+        return len(self._queue)
+
+    def clear(self):
+        """Remove all queued tasks."""
+        with self._lock:
+            queue = self._queue
+            self._queue = []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        for _, _, task in queue:
+            if isinstance(task, types.GeneratorType):
+                try:
+                    task.close()
+                except ValueError:
+                    # The task is being run in the timer wheel thread
+                    pass
+
+    def _run_slice(self):
+        started = time.monotonic()
+        last_input = self._last_input
+        if started - last_input < self.idle_delay:
+            return
+        while self._last_input == last_input and time.monotonic() - started < self.slice_time:
+            with self._lock:
+                if not self._queue:
+                    # Checked under the lock, so a task added concurrently restarts the timer
+                    if self._timer is not None:
+                        self._timer.cancel()
+                        self._timer = None
+                    return
+                entry = self._queue[0]
+            priority, order, task = entry
+            replacement = None
+            try:
+                if isinstance(task, types.GeneratorType):
+                    next(task)
+                    continue
+                result = task()
+            except StopIteration:
+                pass
+            except Exception as exc:
+                xbmc.log('pyxbmct: idle task {!r} failed: {!r}'.format(task, exc), xbmc.LOGERROR)
+            else:
+                if isinstance(result, types.GeneratorType):
+                    # A generator function: continue with its generator in place of the function
+                    replacement = (priority, order, result)
+            with self._lock:
+                self._replace(entry, replacement)
+
+    def _replace(self, entry, replacement):
+        """Replace a queue entry or remove it if ``replacement`` is ``None``"""
+        try:
+            index = self._queue.index(entry)
+        except ValueError:
+            # The queue has been cleared while the task was running
+            return
+        if replacement is not None:
+            # The replacement has the same sort key, so the heap order is kept
+            self._queue[index] = replacement
+        elif index == 0:
+            heapq.heappop(self._queue)
+        else:
+            del self._queue[index]
+            heapq.heapify(self._queue)
@@ -0,0 +1,260 @@
+# coding: utf-8
+# Module: jsonrpc
+# Licence: GPL v.3 <http://www.gnu.org/licenses/gpl.html>
+"""Batched and paged Kodi JSON-RPC data source for :class:`List` controls"""
+
+import json
+import threading
+from collections import OrderedDict
+
+import xbmc
+import xbmcgui
+
+__all__ = ['JsonRpcError', 'call_batch', 'JsonRpcSource']
+
+
+class JsonRpcError(Exception):
+    """JSON-RPC error response"""
+    pass
+
+
+def call_batch(calls, execute=None):
+    """
+    Send several JSON-RPC calls to Kodi in one batch request.
+
+    :param calls: a list of ``(method, params)`` tuples.
+    :param execute: (opt) a function that sends a JSON-RPC request string and returns
+        a response string. By default :func:`xbmc.executeJSONRPC` is used.
+    :return: a list of call results in the same order as ``calls``.
+    :raises: :class:`JsonRpcError` if any call returns an error.
+
+    Example::
+
+        movies, shows = call_batch([
+            ('VideoLibrary.GetMovies', {'properties': ['year']}),
+            ('VideoLibrary.GetTVShows', {'properties': ['year']}),
+        ])
+    """
+    if not calls:
+        return []
+    if execute is None:
+        execute = xbmc.executeJSONRPC
+    request = [{'jsonrpc': '2.0', 'id': index, 'method': method, 'params': params or {}}
+               for index, (method, params) in enumerate(calls)]
+    response = json.loads(execute(json.dumps(request)))
+    if isinstance(response, dict):
+        # Kodi answers a whole batch with one error object if the batch is malformed
+        response = [response]
+    results = [None] * len(calls)
+    for entry in response:
+        if 'error' in entry:
+            raise JsonRpcError('JSON-RPC call {} failed: {}'.format(
+                calls[entry['id']][0] if isinstance(entry.get('id'), int) else '', entry['error']))
+        results[entry['id']] = entry.get('result')
+    return results
+
+
+def _default_item_factory(item):
+    return xbmcgui.ListItem(item.get('label') or item.get('title', ''))
+
+
+class JsonRpcSource:
+    """
+    JsonRpcSource(method, result_key, params=None, page_size=100, max_pages=64, execute=None, cache=None, ttl=300)
+
+    A paged data source for Kodi JSON-RPC list methods, e.g. ``VideoLibrary.GetMovies``
+
+    Pages are requested with ``limits`` parameter. All pages that are missing
+    for a request are fetched in one batch JSON-RPC call and kept in an LRU cache
+    of ``max_pages`` pages. Pages can also be cached persistently
+    in a :class:`DataCache<pyxbmct.datacache.DataCache>` instance.
+
+    :param method: JSON-RPC method name.
+    :param result_key: key of the item list in the method result, e.g. ``'movies'``.
+    :param params: method parameters without ``limits``.
+    :param page_size: number of items in a page.
+    :param max_pages: max number of pages cached in memory.
+    :param execute: (opt) a function that sends a JSON-RPC request string and returns
+        a response string. By default :func:`xbmc.executeJSONRPC` is used.
+    :param cache: (opt) :class:`DataCache<pyxbmct.datacache.DataCache>` instance.
+    :param ttl: page time-to-live in ``cache`` in seconds.
+
+    Example::
+
+        source = JsonRpcSource('VideoLibrary.GetMovies', 'movies',
+                               {'properties': ['year'], 'sort': {'method': 'title'}})
+        source.stream(self.list, lambda movie: xbmcgui.ListItem(movie['label']))
+    """
+    def __init__(self, method, result_key, params=None, page_size=100, max_pages=64, execute=None,
+                 cache=None, ttl=300):
+        self.method = method
+        self.result_key = result_key
+        self.params = dict(params or {})
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self._execute = execute
+        self._cache = cache
+        self._ttl = ttl
+        self._cache_prefix = 'jsonrpc:{}:{}:{}:'.format(method, json.dumps(self.params, sort_keys=True),
+                                                        page_size)
+        self._pages = OrderedDict()
+        self._total = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self.requests_sent = 0
+        """Number of JSON-RPC requests sent to Kodi"""
+
+    def getTotal(self):
+        """
+        Get the total number of items.
+
+        :rtype: int
+        """
+        if self._total is None:
+            self.fetchPages([0])
+        return self._total
+
+    def fetchPages(self, pages):
+        """
+        Get pages, fetching missing ones in one batch request.
+
+        :param pages: an iterable of page indexes.
+        :return: a dict of page index to item list.
+        """
+        pages = list(pages)
+        result = {}
+        missing = []
+        with self._lock:
+            for page in pages:
+                items = self._pages.get(page)
+                if items is not None:
+                    self._pages.move_to_end(page)
+                    result[page] = items
+                elif page not in missing:
+                    missing.append(page)
+        if missing and self._cache is not None:
+            for page in list(missing):
+                cached = self._cache.get(self._cache_prefix + str(page))
+                if cached is not None:
+                    self._total, result[page] = cached
+                    missing.remove(page)
+        if missing:
+            calls = []
+            for page in missing:
+                params = dict(self.params)
+                params['limits'] = {'start': page * self.page_size, 'end': (page + 1) * self.page_size}
+                calls.append((self.method, params))
+            responses = call_batch(calls, self._execute)
+            self.requests_sent += 1
+            for page, response in zip(missing, responses):
+                response = response or {}
+                items = response.get(self.result_key) or []
+                total = response.get('limits', {}).get('total')
+                if total is not None:
+                    self._total = total
+                result[page] = items
+                if self._cache is not None:
+                    self._cache.set(self._cache_prefix + str(page), (self._total, items), self._ttl)
+        with self._lock:
+            for page in pages:
+                self._pages[page] = result[page]
+                self._pages.move_to_end(page)
+            while len(self._pages) > self.max_pages:
+                self._pages.popitem(last=False)
+        return result
+
+    def getItems(self, start, count):
+        """
+        Get a range of items.
+
+        Use this method to feed a virtual list that shows only a window of items.
+
+        :param start: index of the first item.
+        :param count: number of items.
+        :return: a list of items, shorter than ``count`` at the end of data.
+        """
+        if count <= 0:
+            return []
+        first_page = start // self.page_size
+        last_page = (start + count - 1) // self.page_size
+        pages = self.fetchPages(range(first_page, last_page + 1))
+        items = []
+        for page in range(first_page, last_page + 1):
+            items.extend(pages[page])
+        offset = start - first_page * self.page_size
+        return items[offset:offset + count]
+
+    def invalidate(self):
+        """Drop cached pages, including pages of known total size in ``cache``."""
+        with self._lock:
+            pages = set(self._pages)
+            if self._total is not None:
+                pages.update(range((self._total + self.page_size - 1) // self.page_size))
+            self._pages.clear()
+            self._total = None
+        if self._cache is not None:
+            for page in pages:
+                self._cache.delete(self._cache_prefix + str(page))
+
+    def stream(self, list_control, item_factory=None, batch_pages=4, on_done=None):
+        """
+        Fill a :class:`List` control page by page in a background thread.
+
+        :param list_control: :class:`List` instance. Its items are replaced.
+        :param item_factory: (opt) a function that converts a JSON-RPC item
+            to :class:`xbmcgui.ListItem`. By default the item label is used.
+        :param batch_pages: number of pages fetched in one batch request.
+        :param on_done: (opt) a function called without arguments when all items are added.
+
+        Each page is added with one ``addItems()`` call as soon as its batch arrives,
+        so the first items are shown before all data are fetched.
+        A previous streaming of this source is stopped.
+        """
+        self.stopStreaming()
+        if item_factory is None:
+            item_factory = _default_item_factory
+        list_control.reset()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._stream,
+                                        args=(list_control, item_factory, batch_pages, on_done))
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stopStreaming(self):
+        """Stop streaming started with :meth:`stream`."""
+        self._stop_event.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        self._thread = None
+
+    def _stream(self, list_control, item_factory, batch_pages, on_done):
+        monitor = xbmc.Monitor()
+        page = 0
+        done = False
+        while not done:
+            if self._total is None:
+                pages = [page]
+            else:
+                last_page = (self._total - 1) // self.page_size
+                pages = list(range(page, min(page + batch_pages, last_page + 1)))
+                if not pages:
+                    break
+            try:
+                fetched = self.fetchPages(pages)
+            except (JsonRpcError, ValueError) as exc:
+                xbmc.log('pyxbmct: JSON-RPC streaming of {} failed: {!r}'.format(self.method, exc), xbmc.LOGERROR)
+                return
+            for index in pages:
+                if self._stop_event.is_set() or monitor.abortRequested():
+                    return
+                items = fetched[index]
+                if items:
+                    list_control.addItems([item_factory(item) for item in items])
+                if len(items) < self.page_size:
+                    done = True
+                    break
+            page = pages[-1] + 1
+        if on_done is not None:
+            on_done()
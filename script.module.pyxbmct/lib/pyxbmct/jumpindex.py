@@ -0,0 +1,185 @@
+# coding: utf-8
+# Module: jumpindex
+# Licence: GPL v.3 <http://www.gnu.org/licenses/gpl.html>
+"""Alphabetical quick-jump index for long :class:`List` controls"""
+
+import unicodedata
+
+import xbmcgui
+
+__all__ = ['JumpIndex', 'default_bucket']
+
+NUMBERS_BUCKET = '0-9'
+"""Bucket for labels starting with a digit"""
+OTHER_BUCKET = '#'
+"""Bucket for labels starting with a non-alphanumeric character"""
+
+
+def default_bucket(label):
+    """
+    Get a jump bucket for an item label
+
+    Labels are bucketed by their first letter without diacritics,
+    labels starting with digits share a single number bucket.
+
+    :param label: item label
+    :type label: str
+    :rtype: str
+    """
+    if not label:
+        return OTHER_BUCKET
+    char = unicodedata.normalize('NFKD', label[0])[0].upper()
+    if char.isdigit():
+        return NUMBERS_BUCKET
+    if char.isalpha():
+        return char
+    return OTHER_BUCKET
+
+
+class JumpIndex:
+    """
+    JumpIndex(list_control, bucket=default_bucket)
+
+    Quick-jump index for a :class:`List` control
+
+    The index maps buckets (first letters and a number bucket by default)
+    to the first list position of an item in that bucket,
+    so the selection can be moved to any bucket with a single ``selectItem`` call.
+    Items must be added and removed through the index so it is updated incrementally.
+
+    :param list_control: :class:`List` instance.
+    :param bucket: a function that receives an item label and returns its bucket key.
+
+    Example::
+
+        self.jump_index = JumpIndex(self.list)
+        self.jump_index.addItems(labels)
+        self.connect(xbmcgui.ACTION_PAGE_DOWN, self.jump_index.jumpNext)
+        self.connect(xbmcgui.ACTION_PAGE_UP, self.jump_index.jumpPrevious)
+        self.connect(self.letter_button, lambda: self.jump_index.jumpTo('M'))
+    """
+    def __init__(self, list_control, bucket=default_bucket):
+        self._list = list_control
+        self._bucket = bucket
+        self._keys = []
+        self._first = {}
+        list_control.addReplaceListener(self._replace_list)
+
+    def _replace_list(self, list_control):
+        self._list = list_control
+
+    def addItem(self, item):
+        """
+        Add an item to the end of the list.
+
+        :param item: :class:`xbmcgui.ListItem` or str.
+        """
+        self.addItems([item])
+
+    def addItems(self, items):
+        """
+        Add items to the end of the list.
+
+        :param items: list of :class:`xbmcgui.ListItem` objects or strings.
+        """
+        first = self._first
+        keys = self._keys
+        for item in items:
+            label = item.getLabel() if isinstance(item, xbmcgui.ListItem) else item
+            key = self._bucket(label)
+            if key not in first:
+                first[key] = len(keys)
+            keys.append(key)
+        self._list.addItems(items)
+
+    def removeItem(self, position):
+        """
+        Remove an item from the list.
+
+        :param position: item position.
+        """
+        keys = self._keys
+        key = keys.pop(position)
+        self._list.removeItem(position)
+        first = self._first
+        for other, pos in first.items():
+            if pos > position:
+                first[other] = pos - 1
+        if first[key] == position:
+            try:
+                first[key] = keys.index(key, position)
+            except ValueError:
+                del first[key]
+
+    def reset(self):
+        """Remove all items from the list and the index."""
+        self._keys = []
+        self._first = {}
+        self._list.reset()
+
+    def size(self):
+        """Get the number of indexed items."""
+        return len(self._keys)
+
+    def buckets(self):
+        """
+        Get bucket keys in the order they appear in the list
+
+        Can be used to build an on-screen letter strip.
+
+        :rtype: list
+        """
+        return sorted(self._first, key=self._first.get)
+
+    def getPosition(self, key):
+        """
+        Get the first list position for a bucket.
+
+        :param key: bucket key.
+        :return: item position or ``-1`` if the bucket is empty.
+        :rtype: int
+        """
+        return self._first.get(key, -1)
+
+    def getBucket(self, position):
+        """
+        Get the bucket key of an item.
+
+        :param position: item position.
+        :rtype: str
+        """
+        return self._keys[position]
+
+    def jumpTo(self, key):
+        """
+        Select the first item in a bucket.
+
+        :param key: bucket key.
+        :return: ``True`` if the bucket exists.
+        :rtype: bool
+        """
+        position = self._first.get(key)
+        if position is None:
+            return False
+        self._list.selectItem(position)
+        return True
+
+    def jumpNext(self):
+        """Select the first item of the bucket following the one of the selected item."""
+        self._jump(1)
+
+    def jumpPrevious(self):
+        """Select the first item of the bucket preceding the one of the selected item."""
+        self._jump(-1)
+
+    def _jump(self, step):
+        selected = self._list.getSelectedPosition()
+        if selected < 0 or not self._keys:
+            return
+        buckets = self.buckets()
+        current = buckets.index(self._keys[selected])
+        if step < 0 and self._first[buckets[current]] < selected:
+            # Go to the start of the current bucket first
+            step = 0
+        target = buckets[(current + step) % len(buckets)]
+        self._list.selectItem(self._first[target])
@@ -0,0 +1,277 @@
+# coding: utf-8
+# Module: listfilter
+# Licence: GPL v.3 <http://www.gnu.org/licenses/gpl.html>
+"""Incremental live filtering of :class:`List` contents from an :class:`Edit` control"""
+
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+import xbmc
+import xbmcgui
+
+__all__ = ['ListFilter']
+
+
+def _as_list_item(item):
+    if isinstance(item, xbmcgui.ListItem):
+        return item
+    return xbmcgui.ListItem(item)
+
+
+class ListFilter:
+    """
+    ListFilter(edit, list_control, items=None, prefix=False, debounce=0.3, poll_interval=0.1)
+
+    Live filter that shows only :class:`List` items matching the text
+    typed into an :class:`Edit` control.
+
+    Item labels are indexed once: a sorted prefix index is used in prefix mode
+    and a trigram index in substring mode. When a query extends the previous one
+    only the previous result set is re-checked. The list is updated by removing
+    and appending only the items that differ from what is currently displayed.
+    If more than ``MAX_REMOVALS`` items must be removed, the list is reset
+    and filled again with one ``addItems`` call. Matching is case-insensitive.
+
+    :param edit: :class:`Edit` instance which text is used as a filter query.
+        It can be ``None`` if the query is set with :meth:`setQuery` only.
+    :param list_control: :class:`List` instance to be filtered.
+    :param items: initial list of :class:`xbmcgui.ListItem` objects or strings.
+    :param prefix: if ``True``, match only labels starting with a query,
+        otherwise match labels containing a query.
+    :param debounce: the time in seconds the :class:`Edit` text must stay unchanged
+        before filtering is applied.
+    :param poll_interval: :class:`Edit` text polling interval in seconds.
+
+    .. note:: Both controls must be placed in a window before the filter is started.
+
+    Example::
+
+        self.filter = ListFilter(self.search_edit, self.list, labels)
+        self.filter.start()
+        ...
+        self.filter.stop()
+    """
+    NGRAM = 3
+    # Each removeItem call is a separate GUI update, so many removals are slower
+    # than adding all matching items again in one batch
+    MAX_REMOVALS = 20
+
+    def __init__(self, edit, list_control, items=None, prefix=False, debounce=0.3, poll_interval=0.1):
+        self._edit = edit
+        self._list = list_control
+        self._prefix = prefix
+        self._debounce = debounce
+        self._poll_interval = poll_interval
+        self._items = []
+        self._keys = []
+        self._sorted_keys = []
+        self._sorted_index = array('l')
+        self._ngrams = {}
+        self._query = ''
+        self._results = array('l')
+        self._shown = array('l')
+        self._last_text = ''
+        self._last_change = 0.0
+        self._lock = threading.RLock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        if edit is not None:
+            edit.addReplaceListener(self._replace_edit)
+        list_control.addReplaceListener(self._replace_list)
+        if items:
+            self.setItems(items)
+
+    def _replace_edit(self, edit):
+        self._edit = edit
+
+    def _replace_list(self, list_control):
+        self._list = list_control
+
+    def setItems(self, items):
+        """
+        Replace all filtered items and rebuild the index.
+
+        :param items: list of :class:`xbmcgui.ListItem` objects or strings.
+        """
+        with self._lock:
+            self._items = []
+            self._keys = []
+            self._ngrams = {}
+            self._sorted_keys = []
+            self._sorted_index = array('l')
+            self._index(items)
+            self._results = self._search(self._query, None)
+            self._apply(self._results)
+
+    def addItems(self, items):
+        """
+        Add items to the filter index.
+
+        New items are displayed if they match the current query.
+
+        :param items: list of :class:`xbmcgui.ListItem` objects or strings.
+        """
+        with self._lock:
+            start = len(self._items)
+            self._index(items)
+            new = self._search(self._query, array('l', range(start, len(self._items))))
+            self._results.extend(new)
+            self._apply(self._results)
+
+    def _index(self, items):
+        """Add items to the prefix and n-gram indexes"""
+        n = self.NGRAM
+        start = len(self._items)
+        ngrams = self._ngrams
+        new_keys = []
+        for item in items:
+            list_item = _as_list_item(item)
+            key = list_item.getLabel().casefold()
+            idx = len(self._items)
+            self._items.append(list_item)
+            self._keys.append(key)
+            new_keys.append((key, idx))
+            for gram in {key[i:i + n] for i in range(len(key) - n + 1)}:
+                postings = ngrams.get(gram)
+                if postings is None:
+                    postings = ngrams[gram] = array('l')
+                postings.append(idx)
+        if not self._prefix:
+            return
+        if start == 0:
+            new_keys.sort()
+            self._sorted_keys = [key for key, _ in new_keys]
+            self._sorted_index = array('l', (idx for _, idx in new_keys))
+        else:
+            merged = sorted(zip(self._sorted_keys, self._sorted_index))
+            merged.extend(new_keys)
+            merged.sort()
+            self._sorted_keys = [key for key, _ in merged]
+            self._sorted_index = array('l', (idx for _, idx in merged))
+
+    def _search(self, query, candidates):
+        """
+        Find indexes of items matching a query
+
+        If ``candidates`` is not ``None`` only those items are checked.
+        """
+        if not query:
+            if candidates is None:
+                return array('l', range(len(self._items)))
+            return array('l', candidates)
+        keys = self._keys
+        if self._prefix:
+            if candidates is None:
+                lo = bisect_left(self._sorted_keys, query)
+                hi = bisect_left(self._sorted_keys, query + '\U0010ffff', lo)
+                return array('l', sorted(self._sorted_index[lo:hi]))
+            return array('l', (i for i in candidates if keys[i].startswith(query)))
+        if candidates is None and len(query) >= self.NGRAM:
+            n = self.NGRAM
+            postings = []
+            for i in range(len(query) - n + 1):
+                gram_postings = self._ngrams.get(query[i:i + n])
+                if gram_postings is None:
+                    return array('l')
+                postings.append(gram_postings)
+            candidates = min(postings, key=len)
+        elif candidates is None:
+            candidates = range(len(keys))
+        return array('l', (i for i in candidates if query in keys[i]))
+
+    def setQuery(self, query):
+        """
+        Filter the list by a query string.
+
+        :param query: filter query.
+        """
+        query = query.casefold()
+        with self._lock:
+            if query == self._query:
+                return
+            if self._query and query.startswith(self._query):
+                # The query has been extended so matches are a subset of the current results
+                results = self._search(query, self._results)
+            elif not self._prefix and self._query and self._query in query:
+                results = self._search(query, self._results)
+            else:
+                results = self._search(query, None)
+            self._query = query
+            self._results = results
+            self._apply(results)
+
+    def getQuery(self):
+        """Get the current filter query."""
+        return self._query
+
+    def getResults(self):
+        """
+        Get indexes of items that match the current query.
+
+        :rtype: array.array
+        """
+        return self._results
+
+    def _apply(self, results):
+        """Update the List control with minimal changes"""
+        shown = self._shown
+        n_results = len(results)
+        # Both arrays are sorted, so displayed items that are kept form a prefix of results
+        removed = []
+        kept = 0
+        for position, index in enumerate(shown):
+            if kept < n_results and index == results[kept]:
+                kept += 1
+            else:
+                removed.append(position)
+                if len(removed) > self.MAX_REMOVALS:
+                    break
+        if len(removed) > self.MAX_REMOVALS:
+            self._list.reset()
+            kept = 0
+        else:
+            # Remove from the end to keep the remaining positions valid
+            for position in reversed(removed):
+                self._list.removeItem(position)
+        if kept < n_results:
+            items = self._items
+            self._list.addItems([items[i] for i in results[kept:]])
+        self._shown = array('l', results)
+
+    def poll(self):
+        """
+        Check the :class:`Edit` text and apply the filter if the text has settled.
+
+        This method is called periodically by the polling thread started with :meth:`start`
+        but it can also be called from a connected action handler.
+        """
+        text = self._edit.getText()
+        now = time.monotonic()
+        if text != self._last_text:
+            self._last_text = text
+            self._last_change = now
+        elif now - self._last_change >= self._debounce and text.casefold() != self._query:
+            self.setQuery(text)
+
+    def start(self):
+        """Start polling the :class:`Edit` control in a background thread."""
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._poll_loop)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Stop the polling thread."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _poll_loop(self):
+        monitor = xbmc.Monitor()
+        while not (self._stop_event.is_set() or monitor.waitForAbort(self._poll_interval)):
+            self.poll()
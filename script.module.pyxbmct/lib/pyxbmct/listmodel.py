@@ -0,0 +1,239 @@
+# coding: utf-8
+# Module: listmodel
+# Licence: GPL v.3 <http://www.gnu.org/licenses/gpl.html>
+"""Sortable data model for :class:`List` controls"""
+
+import locale
+
+import xbmcgui
+
+__all__ = ['ListModel', 'collation_key']
+
+
+def _default_item_factory(row):
+    return xbmcgui.ListItem(str(row))
+
+
+def collation_key(value):
+    """
+    Get a locale-aware sort key for a value.
+
+    Strings are compared case-insensitively according to the current locale,
+    and ``None`` values are sorted after all other values.
+
+    :param value: a string, a number or ``None``.
+    """
+    if isinstance(value, str):
+        return 0, locale.strxfrm(value.casefold())
+    if value is None:
+        return 2, 0
+    return 1, value
+
+
+class ListModel:
+    """
+    ListModel(list_control, rows=None, columns=None, item_factory=None)
+
+    Sortable data model behind a :class:`List` control
+
+    A ListItem is created once for each row and reused every time the list is re-sorted.
+    Collation keys are computed once per row and column, and a sorting permutation
+    is cached for each sort order, so switching between already used sort orders
+    only re-adds the existing ListItems.
+
+    :param list_control: :class:`List` instance.
+    :param rows: initial data rows.
+    :param columns: a dict of ``{column name: function}`` where the function receives
+        a row and returns a value to sort by. If a function is omitted for a column,
+        ``row[column]`` is used.
+    :param item_factory: a function that receives a row and returns
+        a :class:`xbmcgui.ListItem` instance for it.
+
+    String values are compared with the current locale collation rules
+    (:func:`locale.strxfrm`).
+
+    Example::
+
+        self.model = ListModel(self.list, movies,
+                               columns={'title': None, 'year': None},
+                               item_factory=lambda movie: xbmcgui.ListItem(movie['title']))
+        self.model.sortBy('title')
+        ...
+        self.model.sortBy(('year', 'title'), reverse=True)
+    """
+    def __init__(self, list_control, rows=None, columns=None, item_factory=None):
+        self._list = list_control
+        self._item_factory = item_factory or _default_item_factory
+        self._columns = {}
+        for name, getter in (columns or {}).items():
+            self.addColumn(name, getter)
+        self._rows = []
+        self._items = []
+        self._keys = {}
+        self._permutations = {}
+        self._order = None
+        self._reverse = False
+        self._shown = []
+        list_control.addReplaceListener(self._replace_list)
+        if rows:
+            self.setRows(rows)
+
+    def _replace_list(self, list_control):
+        self._list = list_control
+
+    def addColumn(self, name, getter=None):
+        """
+        Add a sortable column.
+
+        :param name: column name.
+        :param getter: a function that receives a row and returns a value to sort by.
+            If ``None``, ``row[name]`` is used.
+        """
+        if getter is None:
+            def getter(row, name=name):
+                return row[name]
+        self._columns[name] = getter
+
+    def setRows(self, rows):
+        """
+        Replace model rows and re-populate the list with the current sort order.
+
+        :param rows: data rows.
+        """
+        self._rows = list(rows)
+        self._items = [self._item_factory(row) for row in self._rows]
+        self._keys = {}
+        self._permutations = {}
+        # Old row indexes are meaningless for new rows
+        self._shown = []
+        self._populate()
+
+    def addRows(self, rows):
+        """
+        Add rows to the model.
+
+        If the list is sorted, it is re-populated to keep the sort order,
+        otherwise new items are appended to the list.
+
+        :param rows: data rows.
+        """
+        rows = list(rows)
+        start = len(self._rows)
+        self._rows.extend(rows)
+        new_items = [self._item_factory(row) for row in rows]
+        self._items.extend(new_items)
+        getters = self._columns
+        for name, keys in self._keys.items():
+            keys.extend(collation_key(getters[name](row)) for row in rows)
+        self._permutations = {}
+        if self._order is None:
+            self._shown.extend(range(start, len(self._rows)))
+            self._list.addItems(new_items)
+        else:
+            self._populate()
+
+    def _column_keys(self, name):
+        """Get cached collation keys for a column"""
+        keys = self._keys.get(name)
+        if keys is None:
+            try:
+                getter = self._columns[name]
+            except KeyError:
+                raise ValueError('Unknown column: {}'.format(name))
+            keys = self._keys[name] = [collation_key(getter(row)) for row in self._rows]
+        return keys
+
+    def _permutation(self, order):
+        """Get a cached row permutation for a sort order"""
+        permutation = self._permutations.get(order)
+        if permutation is None:
+            if len(order) == 1:
+                keys = self._column_keys(order[0])
+            else:
+                keys = list(zip(*(self._column_keys(name) for name in order)))
+            permutation = self._permutations[order] = sorted(range(len(keys)), key=keys.__getitem__)
+        return permutation
+
+    def sortBy(self, columns, reverse=False):
+        """
+        Sort the list.
+
+        :param columns: a column name or a tuple of column names for multi-key sorting.
+        :param reverse: sort in descending order.
+
+        The selected item is preserved.
+        """
+        if isinstance(columns, str):
+            columns = (columns,)
+        order = tuple(columns)
+        if order == self._order and reverse == self._reverse:
+            return
+        self._permutation(order)
+        self._order = order
+        self._reverse = reverse
+        self._populate()
+
+    def getSortOrder(self):
+        """
+        Get the current sort order.
+
+        :return: a tuple of column names and reverse flag or ``(None, False)``
+            if the list is not sorted.
+        :rtype: tuple
+        """
+        return self._order, self._reverse
+
+    def _populate(self):
+        """Re-add ListItems to the list in the current order"""
+        selected_row = self.getSelectedRowIndex()
+        if self._order is None:
+            shown = list(range(len(self._rows)))
+        else:
+            shown = self._permutation(self._order)
+            if self._reverse:
+                shown = shown[::-1]
+        self._shown = shown
+        items = self._items
+        self._list.reset()
+        self._list.addItems([items[i] for i in shown])
+        if 0 <= selected_row < len(self._rows):
+            self._list.selectItem(shown.index(selected_row))
+        elif shown:
+            self._list.selectItem(0)
+
+    def getRow(self, position):
+        """
+        Get a data row by list position.
+
+        :param position: item position in the list.
+        """
+        return self._rows[self._shown[position]]
+
+    def getSelectedRowIndex(self):
+        """
+        Get the model index of the selected row.
+
+        :return: row index or ``-1`` if nothing is selected.
+        :rtype: int
+        """
+        if not self._shown:
+            return -1
+        position = self._list.getSelectedPosition()
+        if position < 0 or position >= len(self._shown):
+            return -1
+        return self._shown[position]
+
+    def getSelectedRow(self):
+        """
+        Get the selected data row.
+
+        :return: a row or ``None`` if nothing is selected.
+        """
+        index = self.getSelectedRowIndex()
+        if index < 0:
+            return None
+        return self._rows[index]
+
+    def size(self):
+        """Get the number of rows."""
+        return len(self._rows)
@@ -0,0 +1,158 @@
+# coding: utf-8
+# Module: memtrack
+# Licence: GPL v.3 <http://www.gnu.org/licenses/gpl.html>
+"""Per-window memory accounting with tracemalloc snapshots"""
+
+import time
+import tracemalloc
+import weakref
+
+import xbmc
+
+__all__ = ['MemoryTracker', 'track_windows']
+
+_settings = None
+
+
+def track_windows(enabled=True, top=10, log_file=None, frames=1):
+    """
+    Enable or disable memory tracking for all PyXBMCt windows created after this call.
+
+    :param enabled: ``True`` to enable tracking, ``False`` to disable.
+    :param top: number of top allocation sites in reports.
+    :param log_file: (opt) path to a file where reports are appended.
+        By default reports are written to the Kodi log.
+    :param frames: number of stack frames stored for each allocation.
+
+    Example::
+
+        pyxbmct.track_windows(log_file='/storage/pyxbmct_memory.log')
+        window = MyServiceWindow()
+    """
+    global _settings
+    _settings = {'top': top, 'log_file': log_file, 'frames': frames} if enabled else None
+
+
+def create_tracker(window):
+    """
+    Create a tracker for a new window if tracking is enabled with :func:`track_windows`.
+
+    :return: :class:`MemoryTracker` instance or ``None``.
+    """
+    if _settings is None:
+        return None
+    return MemoryTracker(window, **_settings)
+
+
+class MemoryTracker:
+    """
+    MemoryTracker(window, top=10, log_file=None, frames=1)
+
+    Memory accounting for one PyXBMCt window
+
+    The tracker takes tracemalloc snapshots at window construction,
+    each time ``doModal()`` returns, when the window is torn down
+    with :meth:`teardown<pyxbmct.addonwindow.AbstractWindow.teardown>`
+    and when the window object is destroyed.
+    Each report contains the numbers of the window's controls, :class:`xbmcgui.ListItem`
+    objects in its lists and connected handlers, and the top allocation sites
+    that have grown since the construction snapshot. Allocation sites that still hold memory
+    after teardown or destruction point to leaks.
+
+    If tracemalloc is not running, it is started by the tracker
+    and stopped when the last live tracker is torn down.
+
+    :param window: PyXBMCt window instance.
+    :param top: number of top allocation sites in reports.
+    :param log_file: (opt) path to a file where reports are appended.
+        By default reports are written to the Kodi log.
+    :param frames: number of stack frames stored for each allocation.
+
+    PyXBMCt windows create a tracker on demand,
+    see :meth:`AbstractWindow.enableMemoryTracking<pyxbmct.addonwindow.AbstractWindow.enableMemoryTracking>`.
+    """
+    _active = 0
+    _owns_tracing = False
+
+    def __init__(self, window, top=10, log_file=None, frames=1):
+        self.top = top
+        self.log_file = log_file
+        self._name = type(window).__name__
+        self._window = weakref.ref(window)
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+            MemoryTracker._owns_tracing = True
+        MemoryTracker._active += 1
+        self._baseline = self._take_snapshot()
+        self._finalizer = weakref.finalize(window, self._destroyed)
+
+    @staticmethod
+    def _take_snapshot():
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, __file__),
+        ))
+
+    def countObjects(self):
+        """
+        Count window objects.
+
+        :return: a dict with ``controls``, ``list_items`` and ``handlers`` counts.
+            All counts are 0 if the window has been destroyed.
+        :rtype: dict
+        """
+        window = self._window()
+        if window is None:
+            return {'controls': 0, 'list_items': 0, 'handlers': 0}
+        controls = window._placed_controls
+        list_items = 0
+        for control in controls:
+            if hasattr(control, 'size') and hasattr(control, 'getListItem'):
+                list_items += control.size()
+        handlers = (len(window.actions_connected) + len(window.controls_connected) +
+                    len(window.changes_connected) + len(window.focus_connected))
+        return {'controls': len(controls), 'list_items': list_items, 'handlers': handlers}
+
+    def report(self, stage):
+        """
+        Take a snapshot and report memory growth since the construction snapshot.
+
+        :param stage: stage name in the report, e.g. ``'doModal'``.
+        :return: report text.
+        :rtype: str
+        """
+        if not tracemalloc.is_tracing():
+            return ''
+        snapshot = self._take_snapshot()
+        stats = snapshot.compare_to(self._baseline, 'lineno')
+        growth = sum(stat.size_diff for stat in stats)
+        counts = self.countObjects()
+        lines = ['pyxbmct memory: {} [{}] {:+.1f} KiB, controls={}, list_items={}, handlers={}'.format(
+            self._name, stage, growth / 1024.0, counts['controls'], counts['list_items'], counts['handlers'])]
+        grown = sorted((stat for stat in stats if stat.size_diff > 0), key=lambda stat: -stat.size_diff)
+        for stat in grown[:self.top]:
+            frame = stat.traceback[0]
+            lines.append('  {}:{}: {:+.1f} KiB in {:+d} blocks'.format(
+                frame.filename, frame.lineno, stat.size_diff / 1024.0, stat.count_diff))
+        text = '\n'.join(lines)
+        self._write(text)
+        return text
+
+    def _write(self, text):
+        if self.log_file is None:
+            xbmc.log(text, xbmc.LOGINFO)
+            return
+        try:
+            with open(self.log_file, 'a', encoding='utf-8') as fo:
+                fo.write('{} {}\n'.format(time.strftime('%Y-%m-%d %H:%M:%S'), text))
+        except (IOError, OSError) as exc:
+            xbmc.log('pyxbmct: cannot write memory report: {!r}'.format(exc), xbmc.LOGERROR)
+
+    def _destroyed(self):
+        self.report('destroyed')
+        self._baseline = None
+        MemoryTracker._active -= 1
+        if not MemoryTracker._active and MemoryTracker._owns_tracing:
+            MemoryTracker._owns_tracing = False
+            tracemalloc.stop()
@@ -0,0 +1,231 @@
+# coding: utf-8
+# Module: multiselect
+# Licence: GPL v.3 <http://www.gnu.org/licenses/gpl.html>
+"""Bitset-backed multi-selection for :class:`List` controls"""
+
+import re
+
+__all__ = ['MultiSelection']
+
+# Bit positions set in each byte value. Bit ``n`` of byte ``i`` is item ``8 * i + n``.
+_BITS = tuple(tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256))
+_POPCOUNT = bytes(len(bits) for bits in _BITS)
+_NONZERO = re.compile(b'[^\x00]')
+
+
+class MultiSelection:
+    """
+    MultiSelection(list_control)
+
+    Multi-selection state of a :class:`List` control
+
+    Selection is stored in a compact bitset (1 bit per list item),
+    so bulk operations like :meth:`selectAll` or :meth:`invert` do not touch ListItems.
+    ListItem state (:meth:`xbmcgui.ListItem.select`) is updated only for items around
+    the selected position that can be visible on screen, and only if it differs
+    from what has already been applied to them. Call :meth:`refresh` after the list
+    has scrolled, e.g. from connected move actions.
+
+    An instance is normally obtained with :meth:`List.getMultiSelection`.
+
+    :param list_control: :class:`List` instance.
+
+    Example::
+
+        selection = self.list.getMultiSelection()
+        self.connect(self.list, selection.toggleSelected)
+        self.connectEventList([ACTION_MOVE_UP, ACTION_MOVE_DOWN,
+                               ACTION_MOUSE_WHEEL_UP, ACTION_MOUSE_WHEEL_DOWN],
+                              selection.refresh)
+        ...
+        for index in selection:
+            process(index)
+    """
+    def __init__(self, list_control):
+        self._list = list_control
+        self._size = 0
+        self._bits = bytearray()
+        self._applied = bytearray()
+        list_control.addReplaceListener(self._replace_list)
+
+    def _replace_list(self, list_control):
+        self._list = list_control
+
+    def _sync_size(self):
+        """Resize the bitset to the current list size"""
+        size = self._list.size()
+        if size != self._size:
+            nbytes = (size + 7) // 8
+            if nbytes > len(self._bits):
+                padding = bytes(nbytes - len(self._bits))
+                self._bits.extend(padding)
+                self._applied.extend(padding)
+            else:
+                del self._bits[nbytes:]
+                del self._applied[nbytes:]
+            if size % 8:
+                mask = (1 << size % 8) - 1
+                self._bits[-1] &= mask
+                self._applied[-1] &= mask
+            self._size = size
+        return size
+
+    def _check_index(self, index):
+        if not 0 <= index < self._sync_size():
+            raise IndexError('List item index out of range: {}'.format(index))
+
+    def reset(self):
+        """
+        Forget the selection and the state applied to ListItems.
+
+        Call this method after the list has been re-populated.
+        """
+        self._size = 0
+        self._bits = bytearray()
+        self._applied = bytearray()
+
+    def isSelected(self, index):
+        """
+        Check if an item is selected.
+
+        :param index: item position.
+        :rtype: bool
+        """
+        self._check_index(index)
+        return bool(self._bits[index >> 3] >> (index & 7) & 1)
+
+    def setSelected(self, index, selected=True):
+        """
+        Select or deselect an item.
+
+        :param index: item position.
+        :param selected: new selection state.
+        """
+        self._check_index(index)
+        if selected:
+            self._bits[index >> 3] |= 1 << (index & 7)
+        else:
+            self._bits[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+        self.refresh()
+
+    def toggle(self, index):
+        """
+        Toggle selection of an item.
+
+        :param index: item position.
+        """
+        self.setSelected(index, not self.isSelected(index))
+
+    def toggleSelected(self):
+        """Toggle selection of the currently focused item."""
+        position = self._list.getSelectedPosition()
+        if position >= 0:
+            self.toggle(position)
+
+    def selectRange(self, start, stop, selected=True):
+        """
+        Select or deselect a range of items.
+
+        :param start: the first item position.
+        :param stop: the position after the last item.
+        :param selected: new selection state.
+        """
+        size = self._sync_size()
+        start = max(start, 0)
+        stop = min(stop, size)
+        if start >= stop:
+            return
+        bits = self._bits
+        first_byte = start >> 3
+        last_byte = (stop - 1) >> 3
+        head_mask = (0xFF << (start & 7)) & 0xFF
+        tail_mask = 0xFF >> (7 - ((stop - 1) & 7))
+        if first_byte == last_byte:
+            masks = {first_byte: head_mask & tail_mask}
+        else:
+            masks = {first_byte: head_mask, last_byte: tail_mask}
+            fill = b'\xff' if selected else b'\x00'
+            bits[first_byte + 1:last_byte] = fill * (last_byte - first_byte - 1)
+        for byte, mask in masks.items():
+            if selected:
+                bits[byte] |= mask
+            else:
+                bits[byte] &= ~mask & 0xFF
+        self.refresh()
+
+    def selectAll(self):
+        """Select all items."""
+        self.selectRange(0, self._sync_size())
+
+    def clear(self):
+        """Deselect all items."""
+        self.selectRange(0, self._sync_size(), False)
+
+    def invert(self):
+        """Invert selection of all items."""
+        size = self._sync_size()
+        if not size:
+            return
+        nbytes = len(self._bits)
+        value = int.from_bytes(self._bits, 'little') ^ ((1 << size) - 1)
+        self._bits[:] = value.to_bytes(nbytes, 'little')
+        self.refresh()
+
+    def count(self):
+        """
+        Get the number of selected items.
+
+        :rtype: int
+        """
+        self._sync_size()
+        return sum(self._bits.translate(_POPCOUNT))
+
+    def __len__(self):
+        return self.count()
+
+    def __iter__(self):
+        """Iterate over positions of selected items in ascending order."""
+        self._sync_size()
+        bits = self._bits
+        # Runs of unselected items are skipped by the regex engine
+        for match in _NONZERO.finditer(bits):
+            byte = match.start()
+            base = byte << 3
+            for bit in _BITS[bits[byte]]:
+                yield base + bit
+
+    def selectedIndexes(self):
+        """
+        Get positions of selected items.
+
+        :rtype: list
+        """
+        return list(self)
+
+    def refresh(self, visible=None):
+        """
+        Apply selection state to ListItems that can be visible on screen.
+
+        :param visible: the number of items around the focused item to update.
+            By default it is calculated from the list height and item height.
+        """
+        size = self._sync_size()
+        if not size:
+            return
+        if visible is None:
+            try:
+                visible = self._list.getHeight() // max(self._list.getItemHeight(), 1) + 1
+            except (AttributeError, RuntimeError):
+                visible = 20
+        position = max(self._list.getSelectedPosition(), 0)
+        start = max(position - visible, 0)
+        stop = min(position + visible + 1, size)
+        bits = self._bits
+        applied = self._applied
+        for index in range(start, stop):
+            byte = index >> 3
+            mask = 1 << (index & 7)
+            state = bits[byte] & mask
+            if state != applied[byte] & mask:
+                self._list.getListItem(index).select(bool(state))
+                applied[byte] ^= mask
@@ -0,0 +1,192 @@
+# coding: utf-8
+# Module: perfhud
+# Licence: GPL v.3 <http://www.gnu.org/licenses/gpl.html>
+"""On-screen performance overlay for PyXBMCt windows"""
+
+import os
+import sys
+import time
+from collections import deque
+
+from .addonwindow import Label
+
+__all__ = ['PerformanceHUD', 'EventStats']
+
+
+def _get_rss():
+    """
+    Get resident memory of the process
+
+    :return: a tuple of a label and a size in bytes, or ``None`` if it is not available.
+        If only the peak resident memory is available, the label is ``'peak rss'``.
+    """
+    try:
+        with open('/proc/self/statm') as fo:
+            return 'rss', int(fo.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (IOError, OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KiB on Linux and BSD
+    if sys.platform != 'darwin':
+        peak *= 1024
+    return 'peak rss', peak
+
+
+class EventStats:
+    """
+    EventStats(samples=256)
+
+    Event dispatch counters collected while :class:`PerformanceHUD` is visible
+
+    :param samples: number of recent handler latencies used for percentiles.
+    """
+    __slots__ = ('latencies', 'events')
+
+    def __init__(self, samples=256):
+        self.latencies = deque(maxlen=samples)
+        self.events = 0
+
+    def percentiles(self, *points):
+        """
+        Get handler latency percentiles.
+
+        :param points: percentile points from 0 to 100.
+        :return: a list of latencies in milliseconds or ``None`` values if there are no samples.
+        """
+        ordered = sorted(self.latencies)
+        if not ordered:
+            return [None] * len(points)
+        last = len(ordered) - 1
+        return [ordered[min(last, int(round(point / 100.0 * last)))] * 1000.0 for point in points]
+
+
+class PerformanceHUD:
+    """
+    PerformanceHUD(window, x=10, y=10, width=480, line_height=24, refresh=0.5, samples=256, font='font10')
+
+    A live performance overlay made of :class:`Label<pyxbmct.addonwindow.Label>` controls
+
+    The overlay shows handler latency percentiles, dispatched events per second,
+    the number of placed controls, pending background work (async tasks, timers,
+    idle tasks and queued texture preloads) and resident memory of the process.
+
+    Metrics are collected only while the overlay is visible. When it is hidden,
+    its refresh timer is cancelled and the window dispatches events without timing them.
+    Labels are created on first :meth:`show` and updated only when their text changes.
+
+    :param window: PyXBMCt window instance.
+    :param x: overlay left position in window coordinates.
+    :param y: overlay top position in window coordinates.
+    :param width: overlay width.
+    :param line_height: height of each metric line.
+    :param refresh: refresh interval in seconds.
+    :param samples: number of recent handler latencies used for percentiles.
+    :param font: label font.
+
+    PyXBMCt windows create an overlay on demand,
+    see :meth:`AbstractWindow.enablePerformanceHUD<pyxbmct.addonwindow.AbstractWindow.enablePerformanceHUD>`.
+    """
+    LINES = 5
+
+    def __init__(self, window, x=10, y=10, width=480, line_height=24, refresh=0.5, samples=256,
+                 font='font10'):
+        self._window = window
+        self.x = x
+        self.y = y
+        self.width = width
+        self.line_height = line_height
+        self.refresh = refresh
+        self.samples = samples
+        self.font = font
+        self._labels = []
+        self._texts = []
+        self._timer = None
+        self._last_time = 0.0
+        self._last_events = 0
+
+    def isVisible(self):
+        """
+        Check if the overlay is visible.
+
+        :rtype: bool
+        """
+        return self._timer is not None
+
+    def toggle(self):
+        """Show or hide the overlay."""
+        if self.isVisible():
+            self.hide()
+        else:
+            self.show()
+
+    def show(self):
+        """Show the overlay and start collecting metrics."""
+        if self.isVisible():
+            return
+        if not self._labels:
+            for line in range(self.LINES):
+                label = Label('', font=self.font, textColor='0xFFFFFF00')
+                label.setPosition(self.x, self.y + line * self.line_height)
+                label.setWidth(self.width)
+                label.setHeight(self.line_height)
+                self._labels.append(label)
+            self._window.addControls(self._labels)
+            self._texts = [''] * self.LINES
+        for label in self._labels:
+            label.setVisible(True)
+        self._window._event_stats = EventStats(self.samples)
+        self._last_time = time.monotonic()
+        self._last_events = 0
+        self._update()
+        self._timer = self._window.call_every(self.refresh, self._update)
+
+    def hide(self):
+        """Hide the overlay and stop collecting metrics."""
+        if self._timer is None:
+            return
+        self._timer.cancel()
+        self._timer = None
+        self._window._event_stats = None
+        for label in self._labels:
+            label.setVisible(False)
+
+    def _update(self):
+        window = self._window
+        stats = window._event_stats
+        if stats is None:
+            return
+        now = time.monotonic()
+        elapsed = now - self._last_time
+        rate = (stats.events - self._last_events) / elapsed if elapsed > 0 else 0.0
+        self._last_time = now
+        self._last_events = stats.events
+        p50, p95, p99 = stats.percentiles(50, 95, 99)
+        if p50 is None:
+            latency = 'handlers: no samples'
+        else:
+            latency = 'handlers ms: p50 {:.1f}  p95 {:.1f}  p99 {:.1f}'.format(p50, p95, p99)
+        # Background services of the window are created on first use
+        loop = window._event_loop_thread
+        timer_wheel = window._timer_wheel
+        idle = window._idle_scheduler
+        preloader = window._texture_preloader
+        rss = _get_rss()
+        texts = (
+            latency,
+            'events/s: {:.1f}  total {}'.format(rate, stats.events),
+            'controls: {}'.format(len(window._placed_controls)),
+            'pending: async {}  timers {}  idle {}  preload {}'.format(
+                loop.pendingTasks() if loop is not None else 0,
+                timer_wheel.pendingTimers() if timer_wheel is not None else 0,
+                idle.pendingTasks() if idle is not None else 0,
+                preloader.pending() if preloader is not None else 0),
+            '{}: {:.1f} MiB'.format(rss[0], rss[1] / 1048576.0) if rss is not None else 'rss: n/a',
+        )
+        for index, text in enumerate(texts):
+            if text != self._texts[index]:
+                self._texts[index] = text
+                self._labels[index].setLabel(text)
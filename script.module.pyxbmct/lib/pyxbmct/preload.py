@@ -0,0 +1,135 @@
+# coding: utf-8
+# Module: preload
+# Licence: GPL v.3 <http://www.gnu.org/licenses/gpl.html>
+"""Texture preloading with a pool of hidden Image controls"""
+
+import heapq
+import itertools
+import threading
+from collections import OrderedDict
+
+import xbmcgui
+
+__all__ = ['TexturePreloader']
+
+
+class TexturePreloader:
+    """
+    TexturePreloader(window, pool_size=4, max_working_set=64, dwell=0.2)
+
+    Warms Kodi texture cache for images that will be displayed soon
+
+    Kodi loads a texture only when a control that displays it is rendered,
+    so images of a new page pop in one by one. The preloader assigns queued
+    image paths to a small pool of 1x1 practically transparent :class:`xbmcgui.ControlImage`
+    controls, one path per control every ``dwell`` seconds, so Kodi loads and caches
+    the textures before they are shown by real controls.
+
+    Paths with lower priority values are preloaded first. Paths that have been
+    preloaded recently are not preloaded again. The working set of recent paths
+    is bounded by ``max_working_set``.
+
+    :param window: PyXBMCt window instance.
+    :param pool_size: number of hidden Image controls.
+    :param max_working_set: max number of paths remembered as preloaded.
+    :param dwell: time in seconds an image is kept on a pool control.
+
+    PyXBMCt windows create a preloader on demand,
+    see :meth:`AbstractWindow.preloadTextures<pyxbmct.addonwindow.AbstractWindow.preloadTextures>`.
+    """
+    def __init__(self, window, pool_size=4, max_working_set=64, dwell=0.2):
+        self._window = window
+        self.pool_size = pool_size
+        self.max_working_set = max_working_set
+        self.dwell = dwell
+        self._pool = []
+        self._queue = []
+        self._queued = {}
+        self._counter = itertools.count()
+        self._working_set = OrderedDict()
+        self._timer = None
+        self._lock = threading.Lock()
+        self.preload_count = 0
+        """Number of performed preload operations"""
+
+    def _create_pool(self):
+        for _ in range(self.pool_size):
+            image = xbmcgui.ControlImage(0, 0, 1, 1, '', colorDiffuse='0x01FFFFFF')
+            self._pool.append(image)
+        self._window.addControls(self._pool)
+
+    def preload(self, paths, priority=0):
+        """
+        Queue image paths for preloading.
+
+        :param paths: an iterable of image paths or URLs.
+        :param priority: priority of the paths, e.g. ``0`` for the next page
+            and ``1`` for the page after it. Lower values are preloaded first.
+            A path already queued with a lower priority keeps it.
+        """
+        with self._lock:
+            for path in paths:
+                if not path or path in self._working_set:
+                    continue
+                queued_priority = self._queued.get(path)
+                if queued_priority is not None and queued_priority <= priority:
+                    continue
+                self._queued[path] = priority
+                heapq.heappush(self._queue, (priority, next(self._counter), path))
+            if self._queue and self._timer is None:
+                self._timer = self._window.call_every(self.dwell, self._pump)
+        if self._queue:
+            self._pump()
+
+    def _pump(self):
+        """Assign next queued paths to pool controls"""
+        with self._lock:
+            if not self._pool:
+                self._create_pool()
+            for image in self._pool:
+                path = self._pop()
+                if path is None:
+                    break
+                image.setImage(path)
+                self._working_set[path] = None
+                self.preload_count += 1
+            while len(self._working_set) > self.max_working_set:
+                self._working_set.popitem(last=False)
+            if not self._queue and self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def _pop(self):
+        while self._queue:
+            priority, _, path = heapq.heappop(self._queue)
+            # Skip stale heap entries of re-prioritized paths
+            if self._queued.get(path) == priority:
+                del self._queued[path]
+                return path
+        return None
+
+    def isPreloaded(self, path):
+        """
+        Check if a path is in the working set of preloaded textures.
+
+        :param path: image path or URL.
+        :rtype: bool
+        """
+        return path in self._working_set
+
+    def pending(self):
+        """
+        Get the number of queued paths.
+
+        :rtype: int
+        """
+        return len(self._queued)
+
+    def cancel(self):
+        """Drop all queued paths."""
+        with self._lock:
+            del self._queue[:]
+            self._queued.clear()
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
@@ -0,0 +1,201 @@
+# coding: utf-8
+# Module: profiling
+# Licence: GPL v.3 <http://www.gnu.org/licenses/gpl.html>
+"""cProfile capture of PyXBMCt window sessions"""
+
+import cProfile
+import glob
+import io
+import os
+import pstats
+import threading
+import time
+
+import xbmc
+import xbmcvfs
+from xbmcaddon import Addon
+
+__all__ = ['ProfileSession']
+
+
+class ProfileSession:
+    """
+    ProfileSession(directory=None, max_files=5, prefix='pyxbmct')
+
+    cProfile capture that spans several threads
+
+    cProfile profiles only the thread where it is enabled, so the session keeps
+    one profiler per thread. Calls made through :meth:`call` are profiled in the calling
+    thread, e.g. event handlers and timer callbacks. :meth:`enableThread` profiles
+    everything that runs in the current thread until the session is stopped,
+    e.g. an asyncio event loop thread. When the session is stopped, all profiles
+    are merged into one ``.pstats`` file. Only ``max_files`` newest files are kept.
+
+    If another profiler is already active (Python 3.12+ allows only one),
+    calls are run without profiling.
+
+    :param directory: directory for ``.pstats`` files. By default ``pyxbmct_profiles``
+        in the profile directory of the running addon is used.
+    :param max_files: max number of kept ``.pstats`` files.
+    :param prefix: file name prefix.
+
+    PyXBMCt windows create a session on demand,
+    see :meth:`AbstractWindow.startProfiling<pyxbmct.addonwindow.AbstractWindow.startProfiling>`.
+    """
+    DIRNAME = 'pyxbmct_profiles'
+
+    def __init__(self, directory=None, max_files=5, prefix='pyxbmct'):
+        if directory is None:
+            profile = xbmcvfs.translatePath(Addon().getAddonInfo('profile'))
+            directory = os.path.join(profile, self.DIRNAME)
+        self.directory = directory
+        self.max_files = max_files
+        self.prefix = prefix
+        self._lock = threading.Condition()
+        self._local = threading.local()
+        self._profiles = {}
+        self._enabled_threads = set()
+        self._active = False
+        self.last_file = None
+        """Path to the last written ``.pstats`` file"""
+
+    def isActive(self):
+        """
+        Check if the session is capturing.
+
+        :rtype: bool
+        """
+        return self._active
+
+    def start(self):
+        """Start capturing. Previously captured data are discarded."""
+        with self._lock:
+            self._profiles = {}
+            self._enabled_threads = set()
+            self._active = True
+
+    def _get_profile(self):
+        ident = threading.get_ident()
+        with self._lock:
+            profile = self._profiles.get(ident)
+            if profile is None:
+                profile = self._profiles[ident] = cProfile.Profile()
+            return profile
+
+    def call(self, func, *args):
+        """
+        Call a function and profile it if the session is active.
+
+        :param func: a function to be called.
+        :param args: positional arguments for the function.
+        :return: the function result.
+        """
+        local = self._local
+        if (not self._active or getattr(local, 'depth', 0) or
+                threading.get_ident() in self._enabled_threads):
+            return func(*args)
+        profile = self._get_profile()
+        try:
+            profile.enable()
+        except ValueError:
+            return func(*args)
+        local.depth = 1
+        try:
+            return func(*args)
+        finally:
+            profile.disable()
+            local.depth = 0
+
+    def enableThread(self):
+        """Profile the current thread until :meth:`disableThread` is called or the session is stopped."""
+        ident = threading.get_ident()
+        if not self._active or ident in self._enabled_threads:
+            return
+        profile = self._get_profile()
+        try:
+            profile.enable()
+        except ValueError:
+            return
+        with self._lock:
+            self._enabled_threads.add(ident)
+
+    def disableThread(self):
+        """Stop profiling the current thread enabled with :meth:`enableThread`."""
+        ident = threading.get_ident()
+        with self._lock:
+            if ident not in self._enabled_threads:
+                return
+            self._profiles[ident].disable()
+            self._enabled_threads.discard(ident)
+            self._lock.notify_all()
+
+    def stop(self, timeout=1.0):
+        """
+        Stop capturing and write a ``.pstats`` file.
+
+        Threads enabled with :meth:`enableThread` must call :meth:`disableThread`
+        within ``timeout`` seconds, otherwise their data are discarded.
+
+        :param timeout: max time in seconds to wait for enabled threads.
+        :return: path to the written file or ``None`` if nothing has been captured.
+        """
+        self.disableThread()
+        with self._lock:
+            self._active = False
+            self._lock.wait_for(lambda: not self._enabled_threads, timeout)
+            profiles = [profile for ident, profile in self._profiles.items()
+                        if ident not in self._enabled_threads]
+            self._profiles = {}
+        stats = None
+        for profile in profiles:
+            try:
+                if stats is None:
+                    stats = pstats.Stats(profile)
+                else:
+                    stats.add(profile)
+            except TypeError:
+                # A profile without data
+                continue
+        if stats is None:
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        now = int(time.time() * 1000000)
+        while True:
+            # Microseconds keep names unique and in time order for _rotate
+            seconds, microseconds = divmod(now, 1000000)
+            path = os.path.join(self.directory, '{}-{}-{:06d}.pstats'.format(
+                self.prefix, time.strftime('%Y%m%d-%H%M%S', time.localtime(seconds)), microseconds))
+            if not os.path.exists(path):
+                break
+            now += 1
+        stats.dump_stats(path)
+        self.last_file = path
+        self._rotate()
+        xbmc.log('pyxbmct: profile written to {}'.format(path), xbmc.LOGINFO)
+        return path
+
+    def _rotate(self):
+        files = sorted(glob.glob(os.path.join(self.directory, glob.escape(self.prefix) + '-*.pstats')))
+        for path in files[:-self.max_files]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def summary(self, path=None, limit=20, sort='cumulative'):
+        """
+        Get a text summary of the hottest functions.
+
+        :param path: (opt) ``.pstats`` file. By default the last written file is used.
+        :param limit: number of functions in the summary.
+        :param sort: ``pstats`` sort key, e.g. ``'cumulative'`` or ``'tottime'``.
+        :return: summary text or an empty string if there is no file.
+        :rtype: str
+        """
+        path = path or self.last_file
+        if path is None:
+            return ''
+        stream = io.StringIO()
+        stats = pstats.Stats(path, stream=stream)
+        stats.strip_dirs().sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
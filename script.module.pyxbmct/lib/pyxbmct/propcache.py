@@ -0,0 +1,152 @@
+# coding: utf-8
+# Module: propcache
+# Licence: GPL v.3 <http://www.gnu.org/licenses/gpl.html>
+"""Cross-invocation cache stored in Kodi Home window properties"""
+
+import json
+import time
+
+import xbmc
+import xbmcgui
+
+__all__ = ['PropertyCache']
+
+HOME_WINDOW_ID = 10000
+
+
+class PropertyCache:
+    """
+    PropertyCache(namespace, max_entries=64, max_entry_size=64 * 1024, ttl=3600)
+
+    A cache that stores JSON-serialized values in Kodi Home window properties
+
+    Home window properties live as long as Kodi runs, so cached values
+    are available to subsequent plugin or script invocations that run
+    in fresh Python interpreters, without any disk I/O. Cache keys are namespaced,
+    so different addons do not clash. An index of keys with their expiration time
+    is kept in a separate property and is used to evict expired
+    and least recently stored entries.
+
+    :param namespace: cache namespace, e.g. the addon ID.
+    :param max_entries: max number of entries in the namespace.
+    :param max_entry_size: max size of a serialized value in characters.
+        Larger values are not cached.
+    :param ttl: default time-to-live of cached values in seconds.
+
+    Kodi window property names are case-insensitive, so the namespace and cache keys
+    are lowercased: ``'Genres'`` and ``'genres'`` are the same key.
+
+    Methods have the same signatures as those of
+    :class:`DataCache<pyxbmct.datacache.DataCache>`.
+
+    Example::
+
+        cache = PropertyCache('plugin.video.foo')
+        genres = cache.get('genres')
+        if genres is None:
+            genres = get_genres()
+            cache.set('genres', genres, ttl=24 * 3600)
+    """
+    def __init__(self, namespace, max_entries=64, max_entry_size=64 * 1024, ttl=3600):
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.max_entry_size = max_entry_size
+        self.ttl = ttl
+        self._window = xbmcgui.Window(HOME_WINDOW_ID)
+        self._prefix = 'pyxbmct.{}.'.format(namespace).lower()
+        self._index_property = self._prefix + '__index__'
+
+    def _load_index(self):
+        raw = self._window.getProperty(self._index_property)
+        if not raw:
+            return {}
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return {}
+
+    def _save_index(self, index):
+        self._window.setProperty(self._index_property, json.dumps(index, separators=(',', ':')))
+
+    def get(self, key, default=None, allow_stale=False):
+        """
+        Get a cached value.
+
+        :param key: cache key.
+        :param default: a value returned if the key is not cached.
+        :param allow_stale: if ``True``, return expired values too.
+        """
+        key = key.lower()
+        raw = self._window.getProperty(self._prefix + key)
+        if not raw:
+            return default
+        try:
+            expires, value = json.loads(raw)
+        except ValueError:
+            return default
+        if not allow_stale and expires < time.time():
+            return default
+        return value
+
+    def set(self, key, value, ttl=None):
+        """
+        Store a value in the cache.
+
+        :param key: cache key.
+        :param value: JSON-serializable value.
+        :param ttl: time-to-live in seconds. By default ``self.ttl`` is used.
+        :return: ``False`` if the value exceeds ``max_entry_size`` and has not been stored.
+        :rtype: bool
+        """
+        key = key.lower()
+        now = time.time()
+        expires = now + (self.ttl if ttl is None else ttl)
+        raw = json.dumps([expires, value], separators=(',', ':'))
+        if len(raw) > self.max_entry_size:
+            xbmc.log('pyxbmct: value for {} is too large to cache ({} chars)'.format(key, len(raw)),
+                     xbmc.LOGDEBUG)
+            return False
+        index = self._load_index()
+        index.pop(key, None)
+        # Dict order is insertion order, so the oldest stored entries go first.
+        index[key] = expires
+        for old_key in [k for k, exp in index.items() if exp < now]:
+            self._evict(index, old_key)
+        while len(index) > self.max_entries:
+            self._evict(index, next(iter(index)))
+        self._window.setProperty(self._prefix + key, raw)
+        self._save_index(index)
+        return True
+
+    def _evict(self, index, key):
+        del index[key]
+        self._window.clearProperty(self._prefix + key)
+
+    def delete(self, key):
+        """
+        Remove a value from the cache.
+
+        :param key: cache key.
+        """
+        key = key.lower()
+        index = self._load_index()
+        if key in index:
+            self._evict(index, key)
+            self._save_index(index)
+        else:
+            self._window.clearProperty(self._prefix + key)
+
+    def clear(self):
+        """Remove all values in the namespace."""
+        index = self._load_index()
+        for key in list(index):
+            self._evict(index, key)
+        self._window.clearProperty(self._index_property)
+
+    def keys(self):
+        """
+        Get lowercased keys of cached values in the order they were stored.
+
+        :rtype: list
+        """
+        return list(self._load_index())
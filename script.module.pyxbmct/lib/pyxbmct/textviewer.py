@@ -0,0 +1,243 @@
+# coding: utf-8
+# Module: textviewer
+# Licence: GPL v.3 <http://www.gnu.org/licenses/gpl.html>
+"""Windowed viewer of large text files on top of a :class:`TextBox`"""
+
+import os
+import threading
+from array import array
+
+from .addonwindow import (ACTION_MOVE_UP, ACTION_MOVE_DOWN, ACTION_PAGE_UP, ACTION_PAGE_DOWN,
+                          ACTION_MOUSE_WHEEL_UP, ACTION_MOUSE_WHEEL_DOWN)
+
+__all__ = ['TextViewer']
+
+
+class TextViewer:
+    """
+    TextViewer(window, textbox, path, lines=20, encoding='utf-8', wheel_lines=3, chunk_size=1024 * 1024)
+
+    A viewer that shows a window of lines of a large text file in a :class:`TextBox<pyxbmct.addonwindow.TextBox>`
+
+    The file is never loaded as a whole. It is read in chunks to build an index
+    of line start offsets, and the index is extended only as far as the shown lines
+    require. Only the visible slice of ``lines`` lines is read from the file
+    and set to the TextBox, and only when the slice changes.
+
+    In follow mode the file size is polled. New data are indexed incrementally,
+    and if the viewer is at the end of the file, it is scrolled to the new end,
+    like ``tail -f``. If the file shrinks (e.g. a rotated log), the index is rebuilt.
+
+    :param window: PyXBMCt window instance.
+    :param textbox: :class:`TextBox<pyxbmct.addonwindow.TextBox>` instance placed in the window.
+    :param path: path to a text file.
+    :param lines: number of lines that fit into the TextBox.
+    :param encoding: file encoding. Undecodable bytes are replaced.
+    :param wheel_lines: number of lines scrolled by a mouse wheel action.
+    :param chunk_size: size of chunks read to build the line index.
+
+    Example::
+
+        self.viewer = TextViewer(self, self.log_box, xbmcvfs.translatePath('special://logpath/kodi.log'))
+        self.viewer.bindActions()
+        self.viewer.follow()
+    """
+    def __init__(self, window, textbox, path, lines=20, encoding='utf-8', wheel_lines=3,
+                 chunk_size=1024 * 1024):
+        self._window = window
+        self._textbox = textbox
+        self.path = path
+        self.lines = lines
+        self.encoding = encoding
+        self.wheel_lines = wheel_lines
+        self.chunk_size = chunk_size
+        self._lock = threading.RLock()
+        self._offsets = array('q', [0])
+        self._scanned = 0
+        self._size = 0
+        self._top = 0
+        self._shown = None
+        self._follow_timer = None
+        self._update_size()
+        self.scrollTo(0)
+
+    def _update_size(self):
+        """Check the file size and reset the index if the file has shrunk"""
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            size = 0
+        if size < self._size or size < self._scanned:
+            self._offsets = array('q', [0])
+            self._scanned = 0
+            self._top = 0
+            self._shown = None
+        self._size = size
+
+    def _index(self, min_lines=None):
+        """
+        Extend the line index until it has ``min_lines`` line starts
+        or the whole file is indexed if ``min_lines`` is ``None``.
+        """
+        offsets = self._offsets
+        if self._scanned >= self._size or (min_lines is not None and len(offsets) >= min_lines):
+            return
+        with open(self.path, 'rb') as fo:
+            fo.seek(self._scanned)
+            while self._scanned < self._size and (min_lines is None or len(offsets) < min_lines):
+                chunk = fo.read(min(self.chunk_size, self._size - self._scanned))
+                if not chunk:
+                    break
+                base = self._scanned
+                position = chunk.find(b'\n')
+                while position >= 0:
+                    offsets.append(base + position + 1)
+                    position = chunk.find(b'\n', position + 1)
+                self._scanned += len(chunk)
+
+    def getLineCount(self):
+        """
+        Get the number of lines in the file.
+
+        This method indexes the whole file.
+
+        :rtype: int
+        """
+        with self._lock:
+            self._index()
+            return self._line_count()
+
+    def _line_count(self):
+        offsets = self._offsets
+        # The last line start equals the file size if the file ends with a line break
+        return len(offsets) - 1 if offsets[-1] >= self._size else len(offsets)
+
+    def getTopLine(self):
+        """
+        Get the index of the first visible line.
+
+        :rtype: int
+        """
+        return self._top
+
+    def _read_lines(self, first, count):
+        offsets = self._offsets
+        start = offsets[first]
+        last = first + count
+        end = offsets[last] if last < len(offsets) else self._size
+        if end <= start:
+            return ''
+        with open(self.path, 'rb') as fo:
+            fo.seek(start)
+            data = fo.read(end - start)
+        text = data.decode(self.encoding, 'replace')
+        return text.replace('\r\n', '\n').rstrip('\n')
+
+    def _render(self):
+        last = self._top + self.lines
+        end = self._offsets[last] if last < len(self._offsets) else self._size
+        if (self._top, end) == self._shown:
+            return
+        self._shown = (self._top, end)
+        self._textbox.setText(self._read_lines(self._top, self.lines))
+
+    def scrollTo(self, line):
+        """
+        Show lines starting from a line.
+
+        :param line: index of the first line to show.
+        """
+        with self._lock:
+            # Index one page beyond the requested one to find the last possible top line
+            self._index(max(0, line) + self.lines + 1)
+            max_top = max(0, self._line_count() - self.lines)
+            if self._scanned < self._size:
+                max_top = max(max_top, line)
+            self._top = min(max(0, line), max_top)
+            self._index(self._top + self.lines + 1)
+            self._render()
+
+    def scroll(self, delta):
+        """
+        Scroll the text.
+
+        :param delta: number of lines, negative values scroll up.
+        """
+        self.scrollTo(self._top + delta)
+
+    def pageUp(self):
+        """Scroll one page up."""
+        self.scroll(-self.lines)
+
+    def pageDown(self):
+        """Scroll one page down."""
+        self.scroll(self.lines)
+
+    def scrollToEnd(self):
+        """Show the last lines of the file."""
+        with self._lock:
+            self._update_size()
+            self._index()
+            self._top = max(0, self._line_count() - self.lines)
+            self._render()
+
+    def isAtEnd(self):
+        """
+        Check if the last line of the indexed file is visible.
+
+        :rtype: bool
+        """
+        return self._scanned >= self._size and self._top + self.lines >= self._line_count()
+
+    def bindActions(self):
+        """
+        Connect window navigation actions to the viewer.
+
+        Up/down and page up/down actions scroll by a page,
+        mouse wheel actions scroll by ``wheel_lines`` lines.
+        """
+        window = self._window
+        window.connect(ACTION_MOVE_UP, self.pageUp)
+        window.connect(ACTION_MOVE_DOWN, self.pageDown)
+        window.connect(ACTION_PAGE_UP, self.pageUp)
+        window.connect(ACTION_PAGE_DOWN, self.pageDown)
+        window.connect(ACTION_MOUSE_WHEEL_UP, lambda: self.scroll(-self.wheel_lines))
+        window.connect(ACTION_MOUSE_WHEEL_DOWN, lambda: self.scroll(self.wheel_lines))
+
+    def follow(self, interval=1.0):
+        """
+        Start follow mode: show the end of the file and keep showing it while the file grows.
+
+        :param interval: file size polling interval in seconds.
+        """
+        self.unfollow()
+        self.scrollToEnd()
+        self._follow_timer = self._window.call_every(interval, self._poll)
+
+    def unfollow(self):
+        """Stop follow mode."""
+        if self._follow_timer is not None:
+            self._follow_timer.cancel()
+            self._follow_timer = None
+
+    def isFollowing(self):
+        """
+        Check if follow mode is on.
+
+        :rtype: bool
+        """
+        return self._follow_timer is not None
+
+    def _poll(self):
+        with self._lock:
+            at_end = self.isAtEnd()
+            old_size = self._size
+            self._update_size()
+            if self._size == old_size:
+                return
+            if at_end or self._shown is None:
+                self.scrollToEnd()
+            else:
+                # The visible slice may include the growing last line
+                self._index(self._top + self.lines + 1)
+                self._render()
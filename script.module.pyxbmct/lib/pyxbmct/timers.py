@@ -0,0 +1,181 @@
+# coding: utf-8
+# Module: timers
+# Licence: GPL v.3 <http://www.gnu.org/licenses/gpl.html>
+"""Single-thread timer wheel for periodic window updates"""
+
+import math
+import threading
+import time
+
+import xbmc
+
+__all__ = ['Timer', 'TimerWheel']
+
+
+class Timer:
+    """
+    A scheduled call returned by :meth:`TimerWheel.call_later` and :meth:`TimerWheel.call_every`
+
+    .. note:: Do not create instances of this class directly.
+    """
+    __slots__ = ('callback', 'args', 'interval', 'target_tick', 'cancelled')
+
+    def __init__(self, callback, args, interval):
+        self.callback = callback
+        self.args = args
+        self.interval = interval
+        self.target_tick = 0
+        self.cancelled = False
+
+    def cancel(self):
+        """Cancel the timer."""
+        self.cancelled = True
+
+
+class TimerWheel:
+    """
+    TimerWheel(tick=0.1, slots=512)
+
+    Hashed timer wheel driven by :meth:`xbmc.Monitor.waitForAbort`
+
+    All timers are served by a single daemon thread that wakes up once per ``tick``
+    while there are pending timers and exits when there are none.
+    Timers that are due in the same tick are coalesced and called in one pass.
+    The thread also exits and all timers are dropped when Kodi requests abort.
+
+    Timer callbacks are called from the wheel thread, so they must be short.
+    Exceptions raised by callbacks are written to the Kodi log.
+
+    :param tick: timer resolution in seconds.
+    :param slots: number of wheel slots.
+
+    PyXBMCt windows own a wheel that is stopped when the window is closed,
+    see :meth:`AbstractWindow.call_later<pyxbmct.addonwindow.AbstractWindow.call_later>`.
+    """
+    def __init__(self, tick=0.1, slots=512):
+        self.tick = tick
+        self._slots = [[] for _ in range(slots)]
+        self._lock = threading.Lock()
+        self._count = 0
+        self._current_tick = 0
+        self._start_time = 0.0
+        self._thread = None
+        self._stopped = False
+        self.profile_hook = None
+        """:class:`ProfileSession<pyxbmct.profiling.ProfileSession>` that profiles callbacks or ``None``"""
+
+    def call_later(self, delay, callback, *args):
+        """
+        Call a function once after a delay.
+
+        :param delay: delay in seconds.
+        :param callback: a function to be called.
+        :param args: positional arguments for the function.
+        :return: :class:`Timer` instance that can be cancelled.
+        """
+        timer = Timer(callback, args, None)
+        self._schedule(timer, delay)
+        return timer
+
+    def call_every(self, interval, callback, *args):
+        """
+        Call a function periodically.
+
+        :param interval: interval in seconds.
+        :param callback: a function to be called.
+        :param args: positional arguments for the function.
+        :return: :class:`Timer` instance that can be cancelled.
+        """
+        timer = Timer(callback, args, interval)
+        self._schedule(timer, interval)
+        return timer
+
+    def _schedule(self, timer, delay):
+        with self._lock:
+            if self._thread is None:
+                self._start_time = time.monotonic()
+                self._current_tick = 0
+                self._stopped = False
+                self._thread = threading.Thread(target=self._run)
+                self._thread.daemon = True
+                self._thread.start()
+            self._add(timer, delay)
+
+    def _add(self, timer, delay):
+        ticks = max(1, int(math.ceil(delay / self.tick)))
+        timer.target_tick = self._current_tick + ticks
+        self._slots[timer.target_tick % len(self._slots)].append(timer)
+        self._count += 1
+
+    def pendingTimers(self):
+        """
+        Get the number of scheduled timers, including cancelled ones not yet removed.
+
+        :rtype: int
+        """
+        return self._count
+
+    def stop(self):
+        """Cancel all timers and stop the wheel thread."""
+        with self._lock:
+            self._stopped = True
+            for slot in self._slots:
+                for timer in slot:
+                    timer.cancelled = True
+                del slot[:]
+            self._count = 0
+            thread = self._thread
+            self._thread = None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(self.tick * 2)
+
+    def _run(self):
+        monitor = xbmc.Monitor()
+        n_slots = len(self._slots)
+        while True:
+            if monitor.waitForAbort(self.tick):
+                self.stop()
+                return
+            elapsed = int((time.monotonic() - self._start_time) / self.tick)
+            due = []
+            with self._lock:
+                if self._stopped or self._thread is not threading.current_thread():
+                    return
+                # Catch up on ticks missed while callbacks were running
+                while self._current_tick < elapsed:
+                    self._current_tick += 1
+                    slot = self._slots[self._current_tick % n_slots]
+                    keep = []
+                    for timer in slot:
+                        if timer.cancelled:
+                            self._count -= 1
+                        elif timer.target_tick <= self._current_tick:
+                            self._count -= 1
+                            due.append(timer)
+                        else:
+                            keep.append(timer)
+                    slot[:] = keep
+            for timer in due:
+                # A callback may have stopped the wheel; due timers are not in slots
+                # any more, so stop() could not cancel them
+                if self._stopped:
+                    return
+                if timer.cancelled:
+                    continue
+                hook = self.profile_hook
+                try:
+                    if hook is None:
+                        timer.callback(*timer.args)
+                    else:
+                        hook.call(timer.callback, *timer.args)
+                except Exception as exc:
+                    xbmc.log('pyxbmct: timer callback {!r} failed: {!r}'.format(timer.callback, exc),
+                             xbmc.LOGERROR)
+                if timer.interval is not None and not timer.cancelled:
+                    with self._lock:
+                        if not self._stopped:
+                            self._add(timer, timer.interval)
+            with self._lock:
+                if not self._count and self._thread is threading.current_thread():
+                    self._thread = None
+                    return
@@ -0,0 +1,332 @@
+# coding: utf-8
+# Module: treelist
+# Licence: GPL v.3 <http://www.gnu.org/licenses/gpl.html>
+"""Lazily expanded tree browser built on :class:`List`"""
+
+import threading
+from collections import OrderedDict
+
+import xbmc
+import xbmcgui
+
+__all__ = ['TreeNode', 'TreeList']
+
+
+class TreeNode:
+    """
+    TreeNode(label, data=None, is_leaf=False)
+
+    A node of :class:`TreeList`
+
+    :param label: node label.
+    :param data: arbitrary data associated with the node (e.g. a path or a database ID).
+    :param is_leaf: ``True`` if the node cannot have children.
+    """
+    __slots__ = ('label', 'data', 'is_leaf', 'parent', 'depth', 'children',
+                 'expanded', 'loading', 'list_item')
+
+    def __init__(self, label, data=None, is_leaf=False):
+        self.label = label
+        self.data = data
+        self.is_leaf = is_leaf
+        self.parent = None
+        self.depth = -1
+        self.children = None
+        self.expanded = False
+        self.loading = False
+        self.list_item = None
+
+    def __repr__(self):
+        return '<TreeNode {!r}>'.format(self.label)
+
+
+class TreeList:
+    """
+    TreeList(list_control, loader, root_nodes=None, background=False, max_cached=1000, indent='    ', on_leaf=None)
+
+    Tree browser built on a :class:`List` control
+
+    Children of a node are requested from ``loader`` only when the node is expanded
+    for the first time. Loaded subtrees are cached after collapsing so re-expanding them
+    does not call the loader again. The number of cached nodes of collapsed subtrees
+    is bounded by ``max_cached``, the least recently collapsed subtrees are dropped first.
+
+    The flattened list of visible rows is spliced on expand/collapse: only rows below
+    the changed node are removed from and re-added to the :class:`List`, and ListItems
+    are created once per node and reused.
+
+    :param list_control: :class:`List` instance.
+    :param loader: a function that receives a parent :class:`TreeNode` and returns
+        an iterable of child :class:`TreeNode` objects.
+    :param root_nodes: an iterable of top-level :class:`TreeNode` objects.
+        If ``None``, ``loader`` is called with ``None`` to get them.
+    :param background: if ``True``, ``loader`` is called in a background thread
+        and a placeholder row is displayed while children are loading.
+    :param max_cached: max number of nodes kept in collapsed subtrees.
+    :param indent: a string prepended to a label for each depth level.
+    :param on_leaf: a function that is called with a leaf :class:`TreeNode`
+        when it is activated.
+
+    Example::
+
+        def load_children(node):
+            path = node.data if node is not None else '/'
+            dirs, files = xbmcvfs.listdir(path)
+            return ([TreeNode(d, os.path.join(path, d)) for d in dirs] +
+                    [TreeNode(f, os.path.join(path, f), is_leaf=True) for f in files])
+
+        self.tree = TreeList(self.list, load_children, background=True, on_leaf=self.play)
+        self.connect(self.list, self.tree.activateSelected)
+    """
+    LOADING_LABEL = '...'
+    EXPANDED_MARK = '- '
+    COLLAPSED_MARK = '+ '
+    LEAF_MARK = '  '
+
+    def __init__(self, list_control, loader, root_nodes=None, background=False, max_cached=1000,
+                 indent='    ', on_leaf=None):
+        self._list = list_control
+        self._loader = loader
+        self._background = background
+        self._max_cached = max_cached
+        self._indent = indent
+        self._on_leaf = on_leaf
+        self._lock = threading.RLock()
+        self._rows = []
+        self._cached = OrderedDict()
+        self._cached_count = 0
+        self.root = TreeNode('', is_leaf=False)
+        self.root.expanded = True
+        if root_nodes is None:
+            root_nodes = loader(None)
+        self._set_children(self.root, root_nodes)
+        self._splice(0, 0, list(self.root.children))
+        list_control.addReplaceListener(self._replace_list)
+
+    def _replace_list(self, list_control):
+        self._list = list_control
+
+    def _set_children(self, node, children):
+        node.children = list(children)
+        for child in node.children:
+            child.parent = node
+            child.depth = node.depth + 1
+
+    def _label(self, node):
+        if node.is_leaf:
+            mark = self.LEAF_MARK
+        elif node.expanded:
+            mark = self.EXPANDED_MARK
+        else:
+            mark = self.COLLAPSED_MARK
+        return self._indent * node.depth + mark + node.label
+
+    def _list_item(self, node):
+        if node.list_item is None:
+            node.list_item = xbmcgui.ListItem(self._label(node))
+            node.list_item.setProperty('depth', str(node.depth))
+        return node.list_item
+
+    def _splice(self, start, remove_count, nodes):
+        """Replace ``remove_count`` visible rows at ``start`` with ``nodes``"""
+        rows = self._rows
+        old_size = len(rows)
+        rows[start:start + remove_count] = nodes
+        selected = self._list.getSelectedPosition()
+        tail = rows[start:]
+        # xbmcgui.ControlList only appends, so rows below the splice point are re-added.
+        if old_size - start > len(rows) // 2:
+            self._list.reset()
+            self._list.addItems([self._list_item(node) for node in rows])
+        else:
+            for position in range(old_size - 1, start - 1, -1):
+                self._list.removeItem(position)
+            self._list.addItems([self._list_item(node) for node in tail])
+        if 0 <= selected < len(rows):
+            self._list.selectItem(selected)
+
+    def _visible_descendants(self, node):
+        """Count visible rows below an expanded node"""
+        count = 0
+        stack = list(node.children or ())
+        while stack:
+            child = stack.pop()
+            count += 1
+            if child.expanded and child.children:
+                stack.extend(child.children)
+        return count
+
+    def _flatten(self, node):
+        """Get visible rows of an expanded node subtree"""
+        result = []
+        stack = list(reversed(node.children or ()))
+        while stack:
+            child = stack.pop()
+            result.append(child)
+            if child.expanded and child.children:
+                stack.extend(reversed(child.children))
+        return result
+
+    def _update_mark(self, node):
+        if node.list_item is not None:
+            node.list_item.setLabel(self._label(node))
+
+    def getNode(self, position):
+        """
+        Get a node by list position.
+
+        :param position: row position.
+        :rtype: TreeNode
+        """
+        return self._rows[position]
+
+    def getSelectedNode(self):
+        """
+        Get the selected node.
+
+        :return: :class:`TreeNode` or ``None`` if nothing is selected.
+        """
+        position = self._list.getSelectedPosition()
+        if 0 <= position < len(self._rows):
+            return self._rows[position]
+        return None
+
+    def activateSelected(self):
+        """
+        Toggle the selected node or call ``on_leaf`` for a leaf.
+
+        Connect this method to the :class:`List` control.
+        """
+        node = self.getSelectedNode()
+        if node is None:
+            return
+        if node.is_leaf:
+            if node.data is not self.LOADING_LABEL and self._on_leaf is not None:
+                self._on_leaf(node)
+        elif node.expanded:
+            self.collapse(node)
+        else:
+            self.expand(node)
+
+    def expand(self, node):
+        """
+        Expand a node, loading its children if necessary.
+
+        :param node: :class:`TreeNode` currently visible in the list.
+        """
+        with self._lock:
+            if node.is_leaf or node.expanded:
+                return
+            if node.children is None:
+                if self._background:
+                    self._load_in_background(node)
+                    return
+                self._set_children(node, self._loader(node))
+            self._uncache(node)
+            node.expanded = True
+            self._update_mark(node)
+            position = self._rows.index(node)
+            self._splice(position + 1, 0, self._flatten(node))
+
+    def collapse(self, node):
+        """
+        Collapse a node.
+
+        Its children stay cached and are not reloaded on the next expand.
+
+        :param node: :class:`TreeNode` currently visible in the list.
+        """
+        with self._lock:
+            if not node.expanded:
+                return
+            position = self._rows.index(node)
+            count = self._visible_descendants(node)
+            node.expanded = False
+            self._update_mark(node)
+            self._splice(position + 1, count, [])
+            if not node.loading:
+                self._cache(node)
+
+    def refresh(self, node):
+        """
+        Drop cached children of a node and reload them.
+
+        :param node: :class:`TreeNode` currently visible in the list.
+        """
+        with self._lock:
+            expanded = node.expanded
+            if expanded:
+                self.collapse(node)
+            self._uncache(node)
+            node.children = None
+            if expanded:
+                self.expand(node)
+
+    def _load_in_background(self, node):
+        # The placeholder is the only child while loading, so collapsing
+        # the node or its ancestors removes it like any other row.
+        placeholder = TreeNode(self.LOADING_LABEL, data=self.LOADING_LABEL, is_leaf=True)
+        self._set_children(node, [placeholder])
+        node.loading = True
+        node.expanded = True
+        self._update_mark(node)
+        position = self._rows.index(node)
+        self._splice(position + 1, 0, [placeholder])
+        thread = threading.Thread(target=self._background_loader, args=(node, placeholder))
+        thread.daemon = True
+        thread.start()
+
+    def _background_loader(self, node, placeholder):
+        try:
+            children = list(self._loader(node))
+        except Exception as exc:
+            xbmc.log('pyxbmct: failed to load children of {!r}: {}'.format(node, exc), xbmc.LOGERROR)
+            children = None
+        with self._lock:
+            if not node.loading or node.children != [placeholder]:
+                # The node has been refreshed while loading
+                return
+            node.loading = False
+            visible = placeholder in self._rows
+            if children is None:
+                node.children = None
+                node.expanded = False
+                self._update_mark(node)
+                if visible:
+                    self._splice(self._rows.index(placeholder), 1, [])
+                return
+            self._set_children(node, children)
+            if visible:
+                self._splice(self._rows.index(placeholder), 1, self._flatten(node))
+            elif not node.expanded:
+                self._cache(node)
+
+    def _cache(self, node):
+        """Register a collapsed loaded subtree and evict the oldest ones over the limit"""
+        if not node.children:
+            return
+        size = 0
+        stack = list(node.children)
+        while stack:
+            child = stack.pop()
+            size += 1
+            # Nested collapsed subtrees are now counted as a part of this one
+            nested_size = self._cached.pop(child, None)
+            if nested_size is not None:
+                self._cached_count -= nested_size
+            if child.children:
+                stack.extend(child.children)
+        self._cached[node] = size
+        self._cached_count += size
+        while self._cached_count > self._max_cached and len(self._cached) > 1:
+            old_node, old_size = self._cached.popitem(last=False)
+            self._cached_count -= old_size
+            old_node.children = None
+
+    def _uncache(self, node):
+        """Remove an expanded subtree and its ancestors from the cache"""
+        while node is not None:
+            size = self._cached.pop(node, None)
+            if size is not None:
+                self._cached_count -= size
+            node = node.parent
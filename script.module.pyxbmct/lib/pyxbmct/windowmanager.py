@@ -0,0 +1,156 @@
+# coding: utf-8
+# Module: windowmanager
+# Licence: GPL v.3 <http://www.gnu.org/licenses/gpl.html>
+"""Navigation stack for multi-screen PyXBMCt addons"""
+
+from collections import OrderedDict
+
+import xbmc
+
+__all__ = ['WindowManager']
+
+
+class WindowManager:
+    """
+    WindowManager(max_alive=5, teardown=None, over_budget=None)
+
+    Navigation stack of PyXBMCt windows
+
+    Only the top window of the stack is displayed. Windows below it and windows
+    that have been navigated away from are hidden with ``hide()`` and kept alive
+    with their timers and background tasks, so going back or re-opening them
+    does not re-create them. If the number of live windows exceeds ``max_alive``
+    or ``over_budget`` reports that a memory budget is exceeded, the least recently
+    displayed ones are torn down and will be re-created by their factories
+    if they are needed again. A window closed with ``close()`` (e.g. by ``ESC`` key)
+    is torn down at once.
+
+    :param max_alive: max number of live windows. Windows are counted
+        regardless of their size, use ``over_budget`` to limit memory usage.
+    :param teardown: (opt) a function that receives an evicted window.
+        By default window's ``teardown()`` method is called if it has one.
+    :param over_budget: (opt) a function without arguments that returns ``True``
+        while live windows use too much memory, e.g. a resident set size check.
+
+    Example::
+
+        manager = WindowManager(max_alive=3)
+
+        class MainWindow(AddonDialogWindow):
+            def __init__(self):
+                ...
+                self.connect(self.movies_button,
+                             lambda: manager.open('movies', MoviesWindow))
+                self.connect(ACTION_NAV_BACK, manager.back)
+
+        manager.run('main', MainWindow)
+    """
+    def __init__(self, max_alive=5, teardown=None, over_budget=None):
+        self.max_alive = max_alive
+        self._teardown = teardown
+        self._over_budget = over_budget
+        self._stack = []
+        self._alive = OrderedDict()
+        self._current = None
+        self._navigated = False
+
+    def _get_window(self, key, factory):
+        window = self._alive.get(key)
+        if window is None:
+            window = factory()
+        else:
+            self._alive.move_to_end(key)
+        self._alive[key] = window
+        self._evict()
+        return window
+
+    def _evict(self):
+        """Tear down the least recently displayed windows over the limits"""
+        while len(self._alive) > max(self.max_alive, 1) or (
+                len(self._alive) > 1 and self._over_budget is not None and self._over_budget()):
+            key, window = next(iter(self._alive.items()))
+            if window is self._current:
+                # The displayed window is never evicted
+                self._alive.move_to_end(key)
+                if len(self._alive) == 1:
+                    break
+                continue
+            del self._alive[key]
+            self._teardown_window(window)
+            xbmc.log('pyxbmct: window {} evicted from the window stack'.format(key), xbmc.LOGDEBUG)
+
+    def _teardown_window(self, window):
+        if self._teardown is not None:
+            self._teardown(window)
+        elif hasattr(window, 'teardown'):
+            window.teardown()
+
+    def open(self, key, factory):
+        """
+        Navigate to a window.
+
+        :param key: a unique window key.
+        :param factory: a callable without arguments that creates the window,
+            e.g. a window class. It is called only if the window is not alive.
+
+        The current window is hidden and kept alive.
+        """
+        self._stack.append((key, factory))
+        self._navigated = True
+        if self._current is not None:
+            self._current.hide()
+
+    def back(self):
+        """
+        Navigate back to the previous window.
+
+        If the stack has a single window, the navigation ends.
+        """
+        if self._stack:
+            self._stack.pop()
+        self._navigated = True
+        if self._current is not None:
+            self._current.hide()
+
+    def clear(self):
+        """End navigation and hide the current window."""
+        del self._stack[:]
+        self._navigated = True
+        if self._current is not None:
+            self._current.hide()
+
+    def getCurrentWindow(self):
+        """Get the displayed window or ``None``."""
+        return self._current
+
+    def getDepth(self):
+        """Get the navigation stack depth."""
+        return len(self._stack)
+
+    def run(self, key, factory):
+        """
+        Display a root window and run navigation until the stack is empty.
+
+        :param key: root window key.
+        :param factory: a callable without arguments that creates the root window.
+
+        A window closed without calling :meth:`open` or :meth:`back`
+        (e.g. by ``ESC`` key) is treated as a back navigation.
+        """
+        self._stack = [(key, factory)]
+        monitor = xbmc.Monitor()
+        try:
+            while self._stack and not monitor.abortRequested():
+                self._current = self._get_window(*self._stack[-1])
+                self._navigated = False
+                self._current.doModal()
+                if not self._navigated:
+                    # The window has been shut down with close()
+                    key = self._stack.pop()[0]
+                    if self._alive.get(key) is self._current:
+                        del self._alive[key]
+                        self._teardown_window(self._current)
+        finally:
+            self._current = None
+            while self._alive:
+                self._teardown_window(self._alive.popitem()[1])
@@ -0,0 +1,97 @@
+# coding: utf-8
+# Module: winstate
+# Licence: GPL v.3 <http://www.gnu.org/licenses/gpl.html>
+"""Persistent storage for PyXBMCt window state"""
+
+import json
+import os
+import time
+
+import xbmcvfs
+from xbmcaddon import Addon
+
+__all__ = ['WindowStateStore']
+
+
+class WindowStateStore:
+    """
+    WindowStateStore(path=None, max_entries=100, max_age=30 * 24 * 3600)
+
+    A compact JSON file with saved window states
+
+    States are keyed by window identity. Entries older than ``max_age``
+    are evicted on save, and if the number of entries exceeds ``max_entries``
+    the least recently saved ones are evicted.
+
+    :param path: path to the state file. By default ``pyxbmct_state.json``
+        in the profile directory of the running addon is used.
+    :param max_entries: max number of saved window states.
+    :param max_age: max age of a saved state in seconds.
+    """
+    FILENAME = 'pyxbmct_state.json'
+
+    def __init__(self, path=None, max_entries=100, max_age=30 * 24 * 3600):
+        if path is None:
+            profile = xbmcvfs.translatePath(Addon().getAddonInfo('profile'))
+            path = os.path.join(profile, self.FILENAME)
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age = max_age
+
+    def _read(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as fo:
+                data = json.load(fo)
+        except (IOError, OSError, ValueError):
+            return {}
+        if not isinstance(data, dict):
+            return {}
+        return data
+
+    def _write(self, data):
+        """Write the store to a temporary file and replace the state file with it"""
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as fo:
+            json.dump(data, fo, separators=(',', ':'))
+        os.replace(temp_path, self.path)
+
+    def load(self, key):
+        """
+        Load a saved window state.
+
+        :param key: window identity key.
+        :return: saved state or ``None``.
+        """
+        entry = self._read().get(key)
+        if entry is None or time.time() - entry.get('t', 0) > self.max_age:
+            return None
+        return entry.get('s')
+
+    def save(self, key, state):
+        """
+        Save a window state and evict stale entries.
+
+        :param key: window identity key.
+        :param state: JSON-serializable window state.
+        """
+        data = self._read()
+        now = time.time()
+        data[key] = {'t': now, 's': state}
+        data = {k: v for k, v in data.items() if now - v.get('t', 0) <= self.max_age}
+        if len(data) > self.max_entries:
+            keys = sorted(data, key=lambda k: data[k].get('t', 0), reverse=True)
+            data = {k: data[k] for k in keys[:self.max_entries]}
+        self._write(data)
+
+    def delete(self, key):
+        """
+        Delete a saved window state.
+
+        :param key: window identity key.
+        """
+        data = self._read()
+        if data.pop(key, None) is not None:
+            self._write(data)
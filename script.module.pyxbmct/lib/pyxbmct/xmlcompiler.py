@@ -0,0 +1,395 @@
+# coding: utf-8
+# Module: xmlcompiler
+# Licence: GPL v.3 <http://www.gnu.org/licenses/gpl.html>
+"""Compiler of PyXBMCt layouts to native WindowXML skin files"""
+
+import hashlib
+import json
+import os
+from xml.etree import ElementTree
+
+import xbmcgui
+import xbmcvfs
+from xbmcaddon import Addon
+
+from . import addonwindow
+from .addonskin import METRIC_NAMES
+
+__all__ = ['compile_layout', 'CompiledWindow']
+
+FIRST_CONTROL_ID = 100
+
+# Positional constructor parameters of PyXBMCt controls
+_ARG_NAMES = {
+    addonwindow.Label: ('label', 'font', 'textColor', 'disabledColor', 'alignment', 'hasPath', 'angle'),
+    addonwindow.FadeLabel: ('font', 'textColor', '_alignment'),
+    addonwindow.TextBox: ('font', 'textColor'),
+    addonwindow.Image: ('filename', 'aspectRatio', 'colorDiffuse'),
+    addonwindow.Button: ('label', 'focusTexture', 'noFocusTexture', 'textOffsetX', 'textOffsetY', 'alignment',
+                         'font', 'textColor', 'disabledColor', 'angle', 'shadowColor', 'focusedColor'),
+    addonwindow.RadioButton: ('label', 'focusTexture', 'noFocusTexture', 'textOffsetX', 'textOffsetY',
+                              '_alignment', 'font', 'textColor', 'disabledColor', 'angle', 'shadowColor',
+                              'focusedColor', 'focusOnTexture', 'noFocusOnTexture', 'focusOffTexture',
+                              'noFocusOffTexture'),
+    addonwindow.Edit: ('label', 'font', 'textColor', 'disabledColor', '_alignment', 'focusTexture',
+                       'noFocusTexture', 'isPassword'),
+    addonwindow.List: ('font', 'textColor', 'buttonTexture', 'buttonFocusTexture', 'selectedColor',
+                       '_imageWidth', '_imageHeight', '_itemTextXOffset', '_itemTextYOffset', '_itemHeight',
+                       '_space', '_alignmentY'),
+    addonwindow.Slider: ('textureback', 'texture', 'texturefocus', 'orientation'),
+}
+
+
+def _control_args(control):
+    """Get constructor arguments of a PyXBMCt control as a dict"""
+    args, kwargs = getattr(control, '_init_args', ((), {}))
+    for cls, names in _ARG_NAMES.items():
+        if isinstance(control, cls):
+            values = dict(zip(names, args))
+            values.update(kwargs)
+            return cls, values
+    raise addonwindow.AddonWindowError('Control {!r} cannot be compiled'.format(control))
+
+
+def _sub(parent, tag, text=None, **attrib):
+    element = ElementTree.SubElement(parent, tag, attrib)
+    if text is not None:
+        element.text = str(text)
+    return element
+
+
+def _align(element, alignment):
+    if alignment is None:
+        return
+    if alignment & addonwindow.ALIGN_RIGHT:
+        _sub(element, 'align', 'right')
+    elif alignment & addonwindow.ALIGN_CENTER_X:
+        _sub(element, 'align', 'center')
+    else:
+        _sub(element, 'align', 'left')
+    if alignment & addonwindow.ALIGN_CENTER_Y:
+        _sub(element, 'aligny', 'center')
+
+
+def _label_props(element, values, label_key='label'):
+    if values.get(label_key):
+        _sub(element, 'label', values[label_key])
+    if values.get('font'):
+        _sub(element, 'font', values['font'])
+    for key, tag in (('textColor', 'textcolor'), ('disabledColor', 'disabledcolor'),
+                     ('focusedColor', 'focusedcolor'), ('shadowColor', 'shadowcolor')):
+        if values.get(key):
+            _sub(element, tag, values[key])
+    if values.get('angle'):
+        _sub(element, 'angle', values['angle'])
+
+
+def _add_control(parent, control_type, control_id, control):
+    element = _sub(parent, 'control', type=control_type, id=str(control_id))
+    _sub(element, 'left', control.getX())
+    _sub(element, 'top', control.getY())
+    _sub(element, 'width', control.getWidth())
+    _sub(element, 'height', control.getHeight())
+    return element
+
+
+def _compile_control(parent, control, control_id):
+    cls, values = _control_args(control)
+    if cls is addonwindow.Label:
+        element = _add_control(parent, 'label', control_id, control)
+        _label_props(element, values)
+        _align(element, values.get('alignment'))
+    elif cls is addonwindow.FadeLabel:
+        element = _add_control(parent, 'fadelabel', control_id, control)
+        _label_props(element, values)
+        _align(element, values.get('_alignment'))
+    elif cls is addonwindow.TextBox:
+        element = _add_control(parent, 'textbox', control_id, control)
+        _label_props(element, values)
+    elif cls is addonwindow.Image:
+        element = _add_control(parent, 'image', control_id, control)
+        _sub(element, 'texture', values.get('filename', ''))
+        aspect = values.get('aspectRatio', 0)
+        _sub(element, 'aspectratio', {0: 'stretch', 1: 'scale', 2: 'keep'}.get(aspect, 'stretch'))
+        if values.get('colorDiffuse'):
+            _sub(element, 'colordiffuse', values['colorDiffuse'])
+    elif cls is addonwindow.Button:
+        element = _add_control(parent, 'button', control_id, control)
+        _label_props(element, values)
+        _align(element, values.get('alignment'))
+        _sub(element, 'texturefocus', values.get('focusTexture', ''))
+        _sub(element, 'texturenofocus', values.get('noFocusTexture', ''))
+        for key, tag in (('textOffsetX', 'textoffsetx'), ('textOffsetY', 'textoffsety')):
+            if values.get(key) is not None:
+                _sub(element, tag, values[key])
+    elif cls is addonwindow.RadioButton:
+        element = _add_control(parent, 'radiobutton', control_id, control)
+        _label_props(element, values)
+        for key, tag in (('focusTexture', 'texturefocus'),
+                         ('noFocusTexture', 'texturenofocus'),
+                         ('focusOnTexture', 'textureradioonfocus'),
+                         ('noFocusOnTexture', 'textureradioonnofocus'),
+                         ('focusOffTexture', 'textureradioofffocus'),
+                         ('noFocusOffTexture', 'textureradiooffnofocus')):
+            if values.get(key):
+                _sub(element, tag, values[key])
+    elif cls is addonwindow.Edit:
+        element = _add_control(parent, 'edit', control_id, control)
+        _label_props(element, values)
+        _sub(element, 'texturefocus', values.get('focusTexture', ''))
+        _sub(element, 'texturenofocus', values.get('noFocusTexture', ''))
+        if values.get('isPassword'):
+            _sub(element, 'password', 'true')
+    elif cls is addonwindow.List:
+        element = _add_control(parent, 'list', control_id, control)
+        item_height = values.get('_itemHeight', 27)
+        width = control.getWidth()
+        for layout, texture in (('itemlayout', values.get('buttonTexture', '')),
+                                ('focusedlayout', values.get('buttonFocusTexture', ''))):
+            layout_element = _sub(element, layout, height=str(item_height + values.get('_space', 2)),
+                                  width=str(width))
+            image = _sub(layout_element, 'control', type='image')
+            _sub(image, 'width', width)
+            _sub(image, 'height', item_height)
+            _sub(image, 'texture', texture)
+            label = _sub(layout_element, 'control', type='label')
+            _sub(label, 'left', values.get('_itemTextXOffset', 10))
+            _sub(label, 'top', values.get('_itemTextYOffset', 2))
+            _sub(label, 'width', width - 2 * values.get('_itemTextXOffset', 10))
+            _sub(label, 'height', item_height)
+            _sub(label, 'aligny', 'center')
+            _sub(label, 'info', 'ListItem.Label')
+            if values.get('font'):
+                _sub(label, 'font', values['font'])
+            if values.get('textColor'):
+                _sub(label, 'textcolor', values['textColor'])
+            if values.get('selectedColor'):
+                _sub(label, 'selectedcolor', values['selectedColor'])
+    elif cls is addonwindow.Slider:
+        element = _add_control(parent, 'slider', control_id, control)
+        _sub(element, 'texturesliderbar', values.get('textureback', ''))
+        _sub(element, 'textureslidernib', values.get('texture', ''))
+        _sub(element, 'textureslidernibfocus', values.get('texturefocus', ''))
+        _sub(element, 'orientation', 'horizontal')
+    return element
+
+
+def _compile_frame(parent, window, ids):
+    """Add AddonWindow frame elements"""
+    metrics = addonwindow.skin.metrics
+    if hasattr(window, 'main_bg'):
+        element = _sub(parent, 'control', type='image', id=str(ids['main_bg']))
+        for tag, value in (('left', 0), ('top', 0), ('width', 1280), ('height', 720),
+                           ('texture', window.main_bg_img)):
+            _sub(element, tag, value)
+    element = _add_control(parent, 'image', ids['background'], window.background)
+    _sub(element, 'texture', window.background_img)
+    element = _add_control(parent, 'image', ids['title_background'], window.title_background)
+    _sub(element, 'texture', window.title_background_img)
+    element = _add_control(parent, 'label', ids['title_bar'], window.title_bar)
+    _sub(element, 'label', window.getWindowTitle())
+    _sub(element, 'font', 'font13_title')
+    if metrics.header_text_color:
+        _sub(element, 'textcolor', metrics.header_text_color)
+    _align(element, metrics.header_align)
+    element = _add_control(parent, 'button', ids['window_close_button'], window.window_close_button)
+    _sub(element, 'texturefocus', metrics.close_button_focus)
+    _sub(element, 'texturenofocus', metrics.close_button_no_focus)
+
+
+def compile_layout(window):
+    """
+    Compile the layout of a PyXBMCt window to WindowXML skin XML
+
+    The window must be set up with :meth:`setGeometry<pyxbmct.addonwindow.AbstractWindow.setGeometry>`
+    and its controls placed with :meth:`placeControl<pyxbmct.addonwindow.AbstractWindow.placeControl>`.
+    Only PyXBMCt control classes are supported. Textures are taken from the current skin.
+    Each placed control gets a numeric ID. Window attributes that reference placed controls
+    are mapped to the IDs of those controls.
+
+    :param window: PyXBMCt window instance. It does not need to be shown.
+    :return: a tuple of XML text and a dict of ``{attribute name: control ID}``.
+    :rtype: tuple
+    """
+    root = ElementTree.Element('window')
+    controls = _sub(root, 'controls')
+    ids = {}
+    next_id = FIRST_CONTROL_ID
+    if isinstance(window, addonwindow.AddonWindow):
+        for name in ('main_bg', 'background', 'title_background', 'title_bar', 'window_close_button'):
+            if hasattr(window, name):
+                ids[name] = next_id
+                next_id += 1
+        _compile_frame(controls, window, ids)
+    control_ids = []
+    for control in window._placed_controls:
+        _compile_control(controls, control, next_id)
+        control_ids.append((control, next_id))
+        next_id += 1
+    for name, value in vars(window).items():
+        for control, control_id in control_ids:
+            if value is control:
+                ids[name] = control_id
+                break
+    if control_ids:
+        _sub(root, 'defaultcontrol', control_ids[0][1])
+    return ElementTree.tostring(root, encoding='unicode'), ids
+
+
+class CompiledWindow(addonwindow.AbstractWindow, xbmcgui.WindowXMLDialog):
+    """
+    CompiledWindow(xml_file, script_path, ids)
+
+    A window loaded by Kodi from a compiled PyXBMCt layout
+
+    Kodi lays out the whole window natively in one load instead of adding
+    controls one by one from Python. Use :meth:`load` to create instances.
+    After the window is initialized, placed controls are available
+    as attributes with the same names as in the source window,
+    and :meth:`setup` is called.
+
+    Controls can be connected before the window is shown
+    by their attribute names, or by control instances after that.
+
+    Example::
+
+        class MyWindow(AddonDialogWindow):
+            def __init__(self):
+                super().__init__('My Addon')
+                self.setGeometry(400, 300, 3, 2)
+                self.ok_button = Button('OK')
+                self.placeControl(self.ok_button, 2, 1)
+
+
+        window = CompiledWindow.load('main', MyWindow, version='1.0')
+        window.connect('ok_button', window.close)
+        window.connect(ACTION_NAV_BACK, window.close)
+        window.doModal()
+    """
+    CACHE_DIR = 'pyxbmct_xml'
+    INDEX_FILE = 'layouts.json'
+
+    def __new__(cls, xml_file, script_path, ids):
+        return super(CompiledWindow, cls).__new__(cls, xml_file, script_path, 'Default', '720p')
+
+    def __init__(self, xml_file, script_path, ids):
+        super(CompiledWindow, self).__init__()
+        self._ids = dict(ids)
+        self._close_button_id = self._ids.get('window_close_button')
+
+    @classmethod
+    def load(cls, key, builder, version='', cache_dir=None):
+        """
+        Create a window from a cached compiled layout or compile it.
+
+        :param key: layout key.
+        :param builder: a callable without arguments that returns a PyXBMCt window
+            with the layout. It is called only if there is no cached layout for ``key``,
+            ``version`` and the current skin.
+        :param version: layout version. Change it when the layout code changes.
+        :param cache_dir: (opt) a directory for compiled layouts.
+            By default ``pyxbmct_xml`` in the running addon profile is used.
+        :rtype: CompiledWindow
+
+        Generated files are named by the hash of their contents.
+        """
+        if cache_dir is None:
+            profile = xbmcvfs.translatePath(Addon().getAddonInfo('profile'))
+            cache_dir = os.path.join(profile, cls.CACHE_DIR)
+        xml_dir = os.path.join(cache_dir, 'resources', 'skins', 'Default', '720p')
+        index_path = os.path.join(cache_dir, cls.INDEX_FILE)
+        metrics = addonwindow.skin.metrics
+        skin_hash = hashlib.sha1(
+            repr([getattr(metrics, name) for name in METRIC_NAMES]).encode('utf-8')).hexdigest()
+        try:
+            with open(index_path, 'r', encoding='utf-8') as fo:
+                index = json.load(fo)
+        except (IOError, OSError, ValueError):
+            index = {}
+        entry = index.get(key)
+        if (entry is None or entry.get('version') != version or entry.get('skin') != skin_hash or
+                not os.path.exists(os.path.join(xml_dir, entry['file']))):
+            source = builder()
+            xml, ids = compile_layout(source)
+            del source
+            file_name = 'pyxbmct-{}.xml'.format(hashlib.sha1(xml.encode('utf-8')).hexdigest()[:16])
+            if not os.path.exists(xml_dir):
+                os.makedirs(xml_dir)
+            file_path = os.path.join(xml_dir, file_name)
+            if not os.path.exists(file_path):
+                with open(file_path, 'w', encoding='utf-8') as fo:
+                    fo.write(xml)
+            entry = index[key] = {'file': file_name, 'ids': ids, 'version': version, 'skin': skin_hash}
+            with open(index_path, 'w', encoding='utf-8') as fo:
+                json.dump(index, fo)
+        return cls(entry['file'], cache_dir, entry['ids'])
+
+    def getControlId(self, name):
+        """
+        Get the ID of a compiled control by its attribute name.
+
+        :param name: control attribute name in the source window.
+        :rtype: int
+        """
+        try:
+            return self._ids[name]
+        except KeyError:
+            raise addonwindow.AddonWindowError('Unknown control: {}'.format(name))
+
+    def onInit(self):
+        """Bind compiled controls to window attributes."""
+        for name, control_id in self._ids.items():
+            setattr(self, name, self.getControl(control_id))
+        self.setup()
+
+    def setup(self):
+        """
+        Set up the window after it has been initialized by Kodi.
+
+        Re-implement this method in a child class to connect controls
+        or fill them with data. By default it does nothing.
+        """
+        pass
+
+    def connect(self, event, callable):
+        """
+        Connect an event to a function.
+
+        :param event: an integer key action code, a control attribute name
+            or a control instance.
+        :param callable: callable object the event is connected to.
+
+        See :meth:`AbstractWindow.connect<pyxbmct.addonwindow.AbstractWindow.connect>` for more info.
+        """
+        if isinstance(event, str):
+            self._click_handlers[self.getControlId(event)] = callable
+        else:
+            super(CompiledWindow, self).connect(event, callable)
+
+    def disconnect(self, event):
+        """
+        Disconnect an event from a function.
+
+        :param event: an integer key action code, a control attribute name
+            or a control instance.
+        :raises: :class:`AddonWindowError<pyxbmct.addonwindow.AddonWindowError>`
+            if an event is not connected to any function.
+        """
+        if isinstance(event, str):
+            if self._click_handlers.pop(self.getControlId(event), None) is None:
+                raise addonwindow.AddonWindowError('The control %s is not connected!' % event)
+        else:
+            super(CompiledWindow, self).disconnect(event)
+
+    def onAction(self, action):
+        """
+        Catch button actions.
+
+        ``action`` is an instance of :class:`xbmcgui.Action` class.
+        """
+        self._registerInput()
+        if action == addonwindow.ACTION_PREVIOUS_MENU:
+            self.close()
+        else:
+            self._executeConnected(action, self.actions_connected)
+            self._checkChanges()
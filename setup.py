@@ -26,7 +26,8 @@ setup(
     ],
     extras_require={
         'dev': [
-            'Sphinx'
+            'Sphinx',
+            'Pillow',
         ]
     },
     zip_safe=False
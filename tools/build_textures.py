@@ -0,0 +1,188 @@
+# coding: utf-8
+# Licence: GPL v.3 <http://www.gnu.org/licenses/gpl.html>
+"""
+Offline build tool for PyXBMCt textures
+
+Creates per-resolution variants of the bundled textures::
+
+    textures/estuary/720p/...
+    textures/estuary/1080p/...
+    textures/estuary/variants.json
+
+At runtime :attr:`Skin.images<pyxbmct.addonskin.Skin.images>` selects the variant
+that matches the display height.
+
+PNG files are recompressed losslessly. JPEG files are copied as is
+at source resolution and re-encoded only when downscaled.
+Variants larger than the source resolution are not created
+because upscaling adds memory without adding detail.
+
+The tool also reports textures that are exact duplicates
+or differ from another texture only by colour, so they can be replaced
+with one texture and a ``colorDiffuse`` tint in Image controls.
+
+Requires Pillow. Usage::
+
+    python tools/build_textures.py [--source-height 1080] [--quality 90] [--clean]
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import shutil
+import sys
+
+try:
+    from PIL import Image
+except ImportError:
+    sys.exit('This tool requires Pillow: pip install Pillow')
+
+TEXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            'script.module.pyxbmct', 'lib', 'pyxbmct', 'textures')
+SKINS = ('estuary', 'confluence')
+RESOLUTIONS = (('720p', 720), ('1080p', 1080), ('2160p', 2160))
+MANIFEST = 'variants.json'
+# Max per-channel difference for colour-only duplicates
+TINT_TOLERANCE = 3
+
+
+def iter_textures(skin_dir):
+    """Yield relative paths of source textures in a skin directory"""
+    variant_dirs = {name for name, _ in RESOLUTIONS}
+    for root, dirs, files in os.walk(skin_dir):
+        if root == skin_dir:
+            dirs[:] = sorted(d for d in dirs if d not in variant_dirs)
+        else:
+            dirs.sort()
+        for filename in sorted(files):
+            if filename.lower().endswith(('.png', '.jpg', '.jpeg')):
+                yield os.path.relpath(os.path.join(root, filename), skin_dir)
+
+
+def save_png(image, path, source_bytes=None):
+    """Save a PNG losslessly, keeping the source bytes if they are smaller"""
+    buffer = io.BytesIO()
+    image.save(buffer, 'PNG', optimize=True)
+    data = buffer.getvalue()
+    if source_bytes is not None and len(source_bytes) <= len(data):
+        data = source_bytes
+    with open(path, 'wb') as fo:
+        fo.write(data)
+    return len(data)
+
+
+def build_variant(skin_dir, rel_path, out_dir, scale, quality):
+    """Write one texture variant and return its size in bytes"""
+    src_path = os.path.join(skin_dir, rel_path)
+    dst_path = os.path.join(out_dir, rel_path)
+    os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+    is_jpeg = rel_path.lower().endswith(('.jpg', '.jpeg'))
+    with open(src_path, 'rb') as fo:
+        source_bytes = fo.read()
+    if scale >= 1.0 and is_jpeg:
+        shutil.copyfile(src_path, dst_path)
+        return len(source_bytes)
+    image = Image.open(io.BytesIO(source_bytes))
+    image.load()
+    if scale < 1.0:
+        size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+        image = image.resize(size, Image.LANCZOS)
+        source_bytes = None
+    if is_jpeg:
+        image.convert('RGB').save(dst_path, 'JPEG', quality=quality, optimize=True, progressive=True)
+        return os.path.getsize(dst_path)
+    return save_png(image, dst_path, source_bytes)
+
+
+def find_tint(image, base):
+    """
+    Get a ``colorDiffuse`` value that turns ``base`` into ``image``
+
+    Kodi multiplies texture colours by the diffuse colour,
+    so ``image`` must be a channel-wise scaled copy of ``base`` with the same alpha.
+
+    :return: colour string in ``0xAARRGGBB`` format or ``None``.
+    """
+    if image.size != base.size:
+        return None
+    image = image.convert('RGBA')
+    base = base.convert('RGBA')
+    if image.getchannel('A').tobytes() != base.getchannel('A').tobytes():
+        return None
+    factors = []
+    for channel in 'RGB':
+        image_data = image.getchannel(channel).tobytes()
+        base_data = base.getchannel(channel).tobytes()
+        base_sum = sum(base_data)
+        if not base_sum:
+            return None
+        factor = sum(image_data) / base_sum
+        if factor > 1.0:
+            return None
+        if any(abs(b * factor - i) > TINT_TOLERANCE for b, i in zip(base_data, image_data)):
+            return None
+        factors.append(round(factor * 255))
+    return '0xFF{:02X}{:02X}{:02X}'.format(*factors)
+
+
+def report_duplicates(skin_dir, textures):
+    """Print exact and colour-only duplicate textures"""
+    by_hash = {}
+    for rel_path in textures:
+        with open(os.path.join(skin_dir, rel_path), 'rb') as fo:
+            by_hash.setdefault(hashlib.sha1(fo.read()).hexdigest(), []).append(rel_path)
+    unique = []
+    for paths in by_hash.values():
+        unique.append(paths[0])
+        for path in paths[1:]:
+            print('  duplicate: {} == {}'.format(path, paths[0]))
+    images = {path: Image.open(os.path.join(skin_dir, path)) for path in unique}
+    for path in unique:
+        for base_path in unique:
+            if base_path == path:
+                continue
+            tint = find_tint(images[path], images[base_path])
+            if tint is not None:
+                print('  tint: {} == {} * colorDiffuse {}'.format(path, base_path, tint))
+                break
+
+
+def build_skin(skin_dir, source_height, quality, clean):
+    """Build all variants of one skin and write its manifest"""
+    textures = list(iter_textures(skin_dir))
+    source_size = sum(os.path.getsize(os.path.join(skin_dir, path)) for path in textures)
+    variants = {}
+    for name, height in RESOLUTIONS:
+        out_dir = os.path.join(skin_dir, name)
+        if clean and os.path.isdir(out_dir):
+            shutil.rmtree(out_dir)
+        if height > source_height:
+            continue
+        size = sum(build_variant(skin_dir, path, out_dir, height / source_height, quality)
+                   for path in textures)
+        variants[name] = height
+        print('  {}: {} files, {} -> {} bytes'.format(name, len(textures), source_size, size))
+    with open(os.path.join(skin_dir, MANIFEST), 'w') as fo:
+        json.dump({'source_height': source_height, 'variants': variants}, fo, indent=2, sort_keys=True)
+    report_duplicates(skin_dir, textures)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build per-resolution variants of PyXBMCt textures')
+    parser.add_argument('--textures', default=TEXTURES_DIR, help='textures directory')
+    parser.add_argument('--source-height', type=int, default=1080,
+                        help='display height the source textures are made for')
+    parser.add_argument('--quality', type=int, default=90, help='JPEG quality of downscaled variants')
+    parser.add_argument('--clean', action='store_true', help='remove existing variants first')
+    args = parser.parse_args(argv)
+    for skin_name in SKINS:
+        skin_dir = os.path.join(args.textures, skin_name)
+        if os.path.isdir(skin_dir):
+            print(skin_name)
+            build_skin(skin_dir, args.source_height, args.quality, args.clean)
+
+
+if __name__ == '__main__':
+    main()